@@ -7,6 +7,7 @@ import sys
 sys.path.append("../derivatives/")
 
 from options import Option, VanillaOption, AssetOrNothinOption
+from structured import StructuredProduct
 
 
 class AppRoot(tk.Tk):
@@ -62,6 +63,7 @@ if __name__ == "__main__":
     pick_frame = PickFrame(app, geom)
     vanilla_frame = OptionFrame(app, geom, True, VanillaOption())
     exotic_frame = OptionFrame(app, geom, False, AssetOrNothinOption())
+    structured_frame = OptionFrame(app, geom, False, StructuredProduct.capital_protected_note())
     
     vol_frame = VisualFrame(app, geom, VisualType.Vol)
     mat_frame = VisualFrame(app, geom, VisualType.Mat)
@@ -73,6 +75,7 @@ if __name__ == "__main__":
     app.add_frame(PickFrame.id, pick_frame)
     app.add_frame(OptionFrame.vanilla_id, vanilla_frame)
     app.add_frame(OptionFrame.exotic_id, exotic_frame)
+    app.add_frame(OptionFrame.structured_id, structured_frame)
     app.add_frame(VisualFrame.vol_id, vol_frame)
     app.add_frame(VisualFrame.mat_id, mat_frame)
     app.add_frame(VisualFrame.rf_id, rf_frame)
@@ -83,6 +86,7 @@ if __name__ == "__main__":
     pick_frame.build()
     vanilla_frame.build()
     exotic_frame.build()
+    structured_frame.build()
     
     # Run App
     app.show(WelcomeFrame.id)
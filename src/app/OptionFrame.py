@@ -16,12 +16,14 @@ sys.path.append("../derivatives/")
 
 from AppRoot import AppRoot
 from options import Option, Period, OptionType, OptionStyle
+from structured import StructuredProduct
 
 
 class OptionFrame(tk.Frame):
     
     vanilla_id = "Vanilla"
     exotic_id = "Exotic"
+    structured_id = "Structured"
     
     # Inputs IDs
     s0 = "value"
@@ -52,6 +54,7 @@ class OptionFrame(tk.Frame):
         self.root = root
         self.vanilla = vanilla
         self.option = option
+        self.structured = isinstance(option, StructuredProduct)
         self.inputs = {}
         self.outputs = {}
         
@@ -67,10 +70,15 @@ class OptionFrame(tk.Frame):
         from PickFrame import PickFrame
         
         self.root.show(PickFrame.id)
-        if self.vanilla:
-            self.root.hide(OptionFrame.vanilla_id)
-        else:
-            self.root.hide(OptionFrame.exotic_id)
+        self.root.hide(self.get_id())
+        
+    def get_id(self) -> str:
+        """
+        Id of the frame in the App
+        """
+        if self.structured:
+            return OptionFrame.structured_id
+        return OptionFrame.vanilla_id if self.vanilla else OptionFrame.exotic_id
     
     def set_period_cb(self):
         """
@@ -110,17 +118,18 @@ class OptionFrame(tk.Frame):
             # If here, all values were valid
             erro_tag.place_forget()
             
-            # Change Price + Greeks
+            # Change Price + Greeks (all computed in one pass)
+            results = self.option.price_greeks()
             price_label = self.outputs[OptionFrame.price_label]
-            price_label.config(text=f"{round(self.option.price(),2)} €")
+            price_label.config(text=f"{round(results.price,2)} €")
             delta_label = self.outputs[OptionFrame.delta_label]
-            delta_label.config(text=f"{round(self.option.delta(),self.greeks_round)}")
+            delta_label.config(text=f"{round(results.delta,self.greeks_round)}")
             gamma_label = self.outputs[OptionFrame.gamma_label]
-            gamma_label.config(text=f"{round(self.option.gamma(),self.greeks_round)}")
+            gamma_label.config(text=f"{round(results.gamma,self.greeks_round)}")
             vega_label = self.outputs[OptionFrame.vega_label]
-            vega_label.config(text=f"{round(self.option.vega(),self.greeks_round)}")
+            vega_label.config(text=f"{round(results.vega,self.greeks_round)}")
             rho_label = self.outputs[OptionFrame.rho_label]
-            rho_label.config(text=f"{round(self.option.rho(),self.greeks_round)}")
+            rho_label.config(text=f"{round(results.rho,self.greeks_round)}")
                         
         except Exception as e:
             # In case of error, show it to the User
@@ -137,10 +146,7 @@ class OptionFrame(tk.Frame):
         vol_frame.build(self.vanilla, self.option)
         
         self.root.show(VisualFrame.vol_id)
-        if self.vanilla:
-            self.root.hide(OptionFrame.vanilla_id)
-        else:
-            self.root.hide(OptionFrame.exotic_id)
+        self.root.hide(self.get_id())
         
         
     def build(self):
@@ -161,7 +167,10 @@ class OptionFrame(tk.Frame):
         # Add "Option" text
         
         
-        txt_value = "Vanilla Option" if self.vanilla else "Asset-Or-Nothing Option"
+        if self.structured:
+            txt_value = self.option.name
+        else:
+            txt_value = "Vanilla Option" if self.vanilla else "Asset-Or-Nothing Option"
         
         option_txt = tk.Label(self, text=txt_value, font=("Arial", 36, "bold"), fg=self.fg, bg=self.bg)
         option_txt.place(x=0,y=100)
@@ -181,7 +190,9 @@ class OptionFrame(tk.Frame):
         self.inputs[OptionFrame.s0] = s0_input
         
         # Strike Price 
-        strike_tag = tk.Label(self, text="Strike Price (€)", font=("Arial", 14), fg=self.fg, bg=self.bg)
+        # The legs of a Structured Product are relative to its reference level
+        strike_txt = "Reference Level (€)" if self.structured else "Strike Price (€)"
+        strike_tag = tk.Label(self, text=strike_txt, font=("Arial", 14), fg=self.fg, bg=self.bg)
         strike_tag.place(x=50, y=230)
         
         strike_input = tk.Entry(self,justify="right")
@@ -246,20 +257,21 @@ class OptionFrame(tk.Frame):
         # Add it to inputs
         self.inputs[OptionFrame.div] = div_input
         
-        # Option Type
-        type_tag = tk.Label(self, text="Option Type", font=("Arial", 14), fg=self.fg, bg=self.bg)
-        type_tag.place(x=50, y=410)
-        
-        type_control_var = tk.IntVar(value=(1 if self.option.option_type is OptionType.Call else 2))
-        self.inputs[OptionFrame.option_type] = type_control_var
-        
-        type_call = tk.Radiobutton(self, text="Call", var=type_control_var,
-            value=1, font=("Arial", 14), fg=self.fg, bg=self.bg, command=self.set_type_cb)
-        type_call.place(x=input_x_offset, y=410)
+        # Option Type (not for Structured Products, each leg has its own)
+        if not self.structured:
+            type_tag = tk.Label(self, text="Option Type", font=("Arial", 14), fg=self.fg, bg=self.bg)
+            type_tag.place(x=50, y=410)
+            
+            type_control_var = tk.IntVar(value=(1 if self.option.option_type is OptionType.Call else 2))
+            self.inputs[OptionFrame.option_type] = type_control_var
+            
+            type_call = tk.Radiobutton(self, text="Call", var=type_control_var,
+                value=1, font=("Arial", 14), fg=self.fg, bg=self.bg, command=self.set_type_cb)
+            type_call.place(x=input_x_offset, y=410)
 
-        type_put = tk.Radiobutton(self, text="Put", var=type_control_var, 
-            value=2, font=("Arial", 14), fg=self.fg, bg=self.bg, command=self.set_type_cb)
-        type_put.place(x=input_x_offset+100, y=410)
+            type_put = tk.Radiobutton(self, text="Put", var=type_control_var, 
+                value=2, font=("Arial", 14), fg=self.fg, bg=self.bg, command=self.set_type_cb)
+            type_put.place(x=input_x_offset+100, y=410)
         
         # Option Style
         #style_tag = tk.Label(self, text="Option Style", font=("Arial", 14), fg=self.fg, bg=self.bg)
@@ -304,11 +316,14 @@ class OptionFrame(tk.Frame):
         
         ######## OUTPUTS #########
         
+        # Price + Greeks, all computed in one pass
+        results = self.option.price_greeks()
+        
         # Add Price 
         price_tag = tk.Label(self, text="Price", font=("Arial", 26, "bold"), fg=self.fg, bg=self.bg)
         price_tag.place(x=1000, y=150)
         
-        price_label = tk.Label(self, text=f"{round(self.option.price(),2)} €", font=("Arial", 26, "bold"),
+        price_label = tk.Label(self, text=f"{round(results.price,2)} €", font=("Arial", 26, "bold"),
             fg=self.fg, bg="light grey", anchor="e")
         price_label.place(x=1000, y=200, width=300, height=50)
         self.outputs[OptionFrame.price_label] = price_label
@@ -320,7 +335,7 @@ class OptionFrame(tk.Frame):
         delta_tag = tk.Label(self, text="Delta", font=("Arial", 18, "bold"), fg=self.fg, bg=self.bg)
         delta_tag.place(x=1000, y=280)
         
-        delta_label = tk.Label(self, text=f"{round(self.option.delta(),self.greeks_round)}", font=("Arial", 18, "bold"),
+        delta_label = tk.Label(self, text=f"{round(results.delta,self.greeks_round)}", font=("Arial", 18, "bold"),
             fg=self.fg, bg="light grey", anchor="e")
         delta_label.place(x=1000, y=310, width=300, height=35)
         self.outputs[OptionFrame.delta_label] = delta_label
@@ -329,7 +344,7 @@ class OptionFrame(tk.Frame):
         gamma_tag = tk.Label(self, text="Gamma", font=("Arial", 18, "bold"), fg=self.fg, bg=self.bg)
         gamma_tag.place(x=1000, y=350)
         
-        gamma_label = tk.Label(self, text=f"{round(self.option.gamma(),self.greeks_round)}", font=("Arial", 18, "bold"),
+        gamma_label = tk.Label(self, text=f"{round(results.gamma,self.greeks_round)}", font=("Arial", 18, "bold"),
             fg=self.fg, bg="light grey", anchor="e")
         gamma_label.place(x=1000, y=380, width=300, height=35)
         self.outputs[OptionFrame.gamma_label] = gamma_label
@@ -338,7 +353,7 @@ class OptionFrame(tk.Frame):
         vega_tag = tk.Label(self, text="Vega", font=("Arial", 18, "bold"), fg=self.fg, bg=self.bg)
         vega_tag.place(x=1000, y=420)
         
-        vega_label = tk.Label(self, text=f"{round(self.option.vega(),self.greeks_round)}", font=("Arial", 18, "bold"),
+        vega_label = tk.Label(self, text=f"{round(results.vega,self.greeks_round)}", font=("Arial", 18, "bold"),
             fg=self.fg, bg="light grey", anchor="e")
         vega_label.place(x=1000, y=450, width=300, height=35)
         self.outputs[OptionFrame.vega_label] = vega_label
@@ -347,25 +362,26 @@ class OptionFrame(tk.Frame):
         rho_tag = tk.Label(self, text="Rho", font=("Arial", 18, "bold"), fg=self.fg, bg=self.bg)
         rho_tag.place(x=1000, y=490)
         
-        rho_label = tk.Label(self, text=f"{round(self.option.rho(),self.greeks_round)}", font=("Arial", 18, "bold"),
+        rho_label = tk.Label(self, text=f"{round(results.rho,self.greeks_round)}", font=("Arial", 18, "bold"),
             fg=self.fg, bg="light grey", anchor="e")
         rho_label.place(x=1000, y=520, width=300, height=35)
         self.outputs[OptionFrame.rho_label] = rho_label
         
         ### END OF GREEKS ###
         
-        # Export Report Button
-        visualize_button = tk.Button(
-            self,
-            text="Visualize Risk",
-            font=("Arial", 24, "bold"),
-            bg="#f0f3f5",
-            fg="#1f3044",
-            width=20,
-            height=2,
-            command=self.visualise_cb 
-        )   
-        visualize_button.pack(pady=100)
-        visualize_button.place(x=1000, y=600)
+        # Export Report Button (risk visualisation is for single options only)
+        if not self.structured:
+            visualize_button = tk.Button(
+                self,
+                text="Visualize Risk",
+                font=("Arial", 24, "bold"),
+                bg="#f0f3f5",
+                fg="#1f3044",
+                width=20,
+                height=2,
+                command=self.visualise_cb 
+            )   
+            visualize_button.pack(pady=100)
+            visualize_button.place(x=1000, y=600)
         
         
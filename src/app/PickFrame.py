@@ -47,6 +47,18 @@ class PickFrame(tk.Frame):
         self.root.hide(PickFrame.id)
         self.root.show(OptionFrame.exotic_id)
         
+    def structured_cb(self):
+        
+        """
+        Callback for the "Structured Product" button present on the pick_frame
+        
+        It will hide PickFrame and show the Structured Product OptionFrame
+        """
+        from OptionFrame import OptionFrame
+        
+        self.root.hide(PickFrame.id)
+        self.root.show(OptionFrame.structured_id)
+        
         
     def build(self):
         
@@ -85,3 +97,17 @@ class PickFrame(tk.Frame):
         # Center the button in the middle of the screen
         exotic_button.place(x=600, y=100, width=400, height=70, anchor="nw")
         
+        # Add Structured Product
+        structured_button = tk.Button(
+            self,
+            text="Structured Product",
+            font=("Arial", 24),
+            bg="#1f3044",
+            fg="#f0f3f5",
+            command=self.structured_cb 
+        )   
+        
+        structured_button.pack(pady=100)
+        
+        structured_button.place(x=1150, y=100, width=400, height=70, anchor="nw")
+        
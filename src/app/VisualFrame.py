@@ -114,6 +114,18 @@ class VisualFrame(tk.Frame):
             self.root.hide(VisualFrame.rf_id)
             
             
+    def get_vol(self, maturity: float):
+        """
+        Volatility of the option along the Asset Price axis: read from the option Volatility Surface
+        (which moves with the Asset Price) if it has one, its flat annual_vol otherwise
+        """
+        
+        if self.option.vol_surface is None:
+            return self.option.annual_vol
+        
+        return self.option.vol_surface.vol(self.option.strike, maturity, s0=self.x_values)
+            
+            
     def update_price(self, val):
         
         val = float(val)
@@ -123,7 +135,7 @@ class VisualFrame(tk.Frame):
             y_values = option_price(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(val),
                 val, 
                 self.option.free_rate,
                 self.option.div_yield,
@@ -149,7 +161,7 @@ class VisualFrame(tk.Frame):
             y_values = option_price(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(self.option.get_years_to_maturity()),
                 self.option.get_years_to_maturity(), 
                 val,
                 self.option.div_yield,
@@ -170,7 +182,7 @@ class VisualFrame(tk.Frame):
             y_values = delta(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(val),
                 val, 
                 self.option.free_rate,
                 self.option.div_yield,
@@ -196,7 +208,7 @@ class VisualFrame(tk.Frame):
             y_values = delta(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(self.option.get_years_to_maturity()),
                 self.option.get_years_to_maturity(), 
                 val,
                 self.option.div_yield,
@@ -217,7 +229,7 @@ class VisualFrame(tk.Frame):
             y_values = gamma(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(val),
                 val, 
                 self.option.free_rate,
                 self.option.div_yield,
@@ -243,7 +255,7 @@ class VisualFrame(tk.Frame):
             y_values = gamma(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(self.option.get_years_to_maturity()),
                 self.option.get_years_to_maturity(), 
                 val,
                 self.option.div_yield,
@@ -264,7 +276,7 @@ class VisualFrame(tk.Frame):
             y_values = vega(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(val),
                 val, 
                 self.option.free_rate,
                 self.option.div_yield,
@@ -290,7 +302,7 @@ class VisualFrame(tk.Frame):
             y_values = vega(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(self.option.get_years_to_maturity()),
                 self.option.get_years_to_maturity(), 
                 val,
                 self.option.div_yield,
@@ -311,7 +323,7 @@ class VisualFrame(tk.Frame):
             y_values = rho(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(val),
                 val, 
                 self.option.free_rate,
                 self.option.div_yield,
@@ -337,7 +349,7 @@ class VisualFrame(tk.Frame):
             y_values = rho(
                 self.x_values,
                 self.option.strike,
-                self.option.annual_vol,
+                self.get_vol(self.option.get_years_to_maturity()),
                 self.option.get_years_to_maturity(), 
                 val,
                 self.option.div_yield,
@@ -382,7 +394,7 @@ class VisualFrame(tk.Frame):
         price_y = option_price(
             self.x_values,
             self.option.strike,
-            self.option.annual_vol,
+            self.get_vol(self.option.get_years_to_maturity()),
             self.option.get_years_to_maturity(), 
             self.option.free_rate,
             self.option.div_yield,
@@ -413,7 +425,7 @@ class VisualFrame(tk.Frame):
         delta_y = delta(
             self.x_values,
             self.option.strike,
-            self.option.annual_vol,
+            self.get_vol(self.option.get_years_to_maturity()),
             self.option.get_years_to_maturity(), 
             self.option.free_rate,
             self.option.div_yield,
@@ -443,7 +455,7 @@ class VisualFrame(tk.Frame):
         gamma_y = gamma(
             self.x_values,
             self.option.strike,
-            self.option.annual_vol,
+            self.get_vol(self.option.get_years_to_maturity()),
             self.option.get_years_to_maturity(), 
             self.option.free_rate,
             self.option.div_yield,
@@ -474,7 +486,7 @@ class VisualFrame(tk.Frame):
         vega_y = vega(
             self.x_values,
             self.option.strike,
-            self.option.annual_vol,
+            self.get_vol(self.option.get_years_to_maturity()),
             self.option.get_years_to_maturity(), 
             self.option.free_rate,
             self.option.div_yield,
@@ -505,7 +517,7 @@ class VisualFrame(tk.Frame):
         rho_y = rho(
             self.x_values,
             self.option.strike,
-            self.option.annual_vol,
+            self.get_vol(self.option.get_years_to_maturity()),
             self.option.get_years_to_maturity(), 
             self.option.free_rate,
             self.option.div_yield,
@@ -0,0 +1,289 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Definition of the Autocallable (and Reverse Convertible) Note, priced by Monte Carlo
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from monte_carlo import RunningStats, MC_CHUNK_SIZE
+from sampling import NormalSource
+
+
+class AutocallResult(NamedTuple):
+    """
+    Result of the Monte Carlo pricing of an Autocallable Note
+
+    == Attributes ==
+    price (float):                      Price of the note
+    std_error (float):                  Standard error of the price
+    nr_paths (int):                     Number of paths simulated
+    expected_life (float):              Expected life of the note (years)
+    call_probabilities (np.ndarray):    Probability of being called on each observation date
+    """
+    price: float
+    std_error: float
+    nr_paths: int
+    expected_life: float
+    call_probabilities: np.ndarray
+
+
+def _autocallable_chunk(nr_paths: int, rng: np.random.Generator, s0: float, reference: float, notional: float,
+    dates: np.ndarray, autocall_barrier: np.ndarray, coupon_barrier: float, coupon: float, memory: bool,
+    protection_barrier: float, annual_vol: float, free_rate: float, div_yield: float,
+    normal_source: NormalSource = None) -> tuple:
+    """
+    Simulates nr_paths paths of the note, from one observation date to the next (exact lognormal steps).
+    Paths called on a date are settled and dropped from the working arrays (active-path compaction),
+    so each step only touches the paths still alive. With a normal_source, the normals of every date
+    are drawn at once (dates x paths), and each date reads the ones of the live paths
+
+    == Returns ==
+    (tuple) Present value of each path, and index of the date each one was called on (len(dates) if never)
+    """
+
+    present_value = np.empty(nr_paths)
+    call_index = np.full(nr_paths, dates.size)
+
+    # Working arrays of the live paths: their position in the outputs, price, PV of the coupons
+    # already paid and number of coupons missed (memory)
+    alive = np.arange(nr_paths)
+    prices = np.full(nr_paths, float(s0))
+    coupons_paid = np.zeros(nr_paths)
+    coupons_missed = np.zeros(nr_paths)
+
+    normals = None if (normal_source is None) else normal_source.normals(dates.size, nr_paths)
+
+    previous = 0.0
+    for i, date in enumerate(dates):
+
+        delta_t = date - previous
+        previous = date
+
+        step = rng.standard_normal(alive.size) if (normals is None) else normals[i, alive]
+        step *= annual_vol*np.sqrt(delta_t)
+        step += (free_rate - div_yield - (annual_vol**2)/2)*delta_t
+        np.exp(step, out=step)
+        prices *= step
+
+        level = prices/reference
+        discount = np.exp(-free_rate*date)
+
+        # Coupon (plus the missed ones, with memory) above the coupon barrier
+        pays_coupon = (level >= coupon_barrier)
+        coupon_now = coupon*notional*pays_coupon*((1 + coupons_missed) if memory else 1)
+        coupons_missed = np.where(pays_coupon, 0, coupons_missed + 1)
+        coupons_paid += discount*coupon_now
+
+        if (i == dates.size - 1):
+            # Maturity: notional back above the protection barrier, the underlying's performance otherwise
+            redemption = notional*np.where(level >= protection_barrier, 1.0, level)
+            present_value[alive] = coupons_paid + discount*redemption
+            break
+
+        called = (level >= autocall_barrier[i])
+        if np.any(called):
+            present_value[alive[called]] = coupons_paid[called] + discount*notional
+            call_index[alive[called]] = i
+
+            # Compaction: keep only the live paths
+            live = ~called
+            alive, prices = alive[live], prices[live]
+            coupons_paid, coupons_missed = coupons_paid[live], coupons_missed[live]
+
+            if (alive.size == 0):
+                break
+
+    return present_value, call_index
+
+
+def mc_autocallable(s0: float, reference: float, notional: float, dates, autocall_barrier, coupon_barrier: float,
+    coupon: float, memory: bool, protection_barrier: float, annual_vol: float, free_rate: float, div_yield: float,
+    target_error: float = None, time_budget: float = None, max_paths: int = 1_000_000,
+    chunk_size: int = MC_CHUNK_SIZE, rng: np.random.Generator = None,
+    normal_source: NormalSource = None) -> AutocallResult:
+    """
+    mc_autocallable
+
+    == Summary ==
+    Prices an Autocallable Note by Monte Carlo. On each observation date:
+    - If the underlying is at or above the coupon barrier, the coupon is paid (plus all the coupons
+      missed before, with memory)
+    - If it is at or above the autocall barrier (before maturity), the note is called: the notional
+      is paid back and the path ends
+    At maturity, the notional is paid back if the underlying is at or above the protection barrier,
+    and the notional times the performance of the underlying otherwise.
+    Paths are simulated in chunks, from one observation date to the next, compacting the live paths
+    after each date. Stops at target_error, time_budget or max_paths (as run_chunked)
+
+    == Args ==
+    s0 (float):                 Current value of the underlying
+    reference (float):          Initial fixing of the underlying (barriers are relative to it)
+    notional (float):           Notional of the note
+    dates (array):              Observation dates (years), the last one being the maturity
+    autocall_barrier (array):   Autocall barrier (fraction of reference), one for all the dates or one per date
+    coupon_barrier (float):     Coupon barrier (fraction of reference)
+    coupon (float):             Coupon per observation date (fraction of notional)
+    memory (bool):              Whether missed coupons are paid later (coupon memory)
+    protection_barrier (float): Capital protection barrier at maturity (fraction of reference)
+    annual_vol (float):         Annual volatility
+    free_rate (float):          Annual risk free rate
+    div_yield (float):          Annual Dividend yield
+    target_error (float):       Standard error to reach (None to ignore)
+    time_budget (float):        Wall-clock budget, in seconds (None to ignore)
+    max_paths (int):            Maximum number of paths
+    chunk_size (int):           Number of paths per chunk
+    rng (Generator):            Random number generator (a new one if None)
+    normal_source (NormalSource): Source of the normals (None: rng)
+
+    == Returns ==
+    (AutocallResult) Price, standard error, paths used, expected life and call probability of each date
+    """
+
+    rng = np.random.default_rng() if (rng is None) else rng
+    dates = np.asarray(dates, dtype=float)
+    autocall_barrier = np.broadcast_to(np.asarray(autocall_barrier, dtype=float), dates.shape)
+
+    stats = RunningStats()
+    # Number of paths ended on each date (called, or redeemed at maturity)
+    ended = np.zeros(dates.size + 1, dtype=np.int64)
+    start = time.perf_counter()
+
+    while (stats.count < max_paths):
+
+        present_value, call_index = _autocallable_chunk(min(chunk_size, max_paths - stats.count), rng, s0,
+            reference, notional, dates, autocall_barrier, coupon_barrier, coupon, memory, protection_barrier,
+            annual_vol, free_rate, div_yield, normal_source)
+        stats.update(present_value)
+        ended += np.bincount(call_index, minlength=dates.size + 1)
+
+        if (target_error is not None) and (stats.std_error <= target_error):
+            break
+        if (time_budget is not None) and (time.perf_counter() - start >= time_budget):
+            break
+
+    probabilities = ended/stats.count
+    # Paths never called live until maturity
+    expected_life = float(probabilities[:-1] @ dates + probabilities[-1]*dates[-1])
+
+    return AutocallResult(float(stats.mean), float(stats.std_error), stats.count, expected_life,
+        probabilities[:-1])
+
+
+class AutocallableNote:
+    """
+    AutocallableNote
+
+    == Summary ==
+    Class that represents an Autocallable Note (see mc_autocallable): periodic observations with an
+    autocall barrier, conditional coupons (with or without memory), and a capital protection barrier
+    at maturity, below which the holder takes the loss of the underlying. With no autocall and
+    unconditional coupons, it is a Reverse Convertible (see reverse_convertible)
+
+    == Attributes ==
+    s0 (float):                     Current value of the underlying
+    reference (float):              Initial fixing of the underlying (None for s0)
+    notional (float):               Notional of the note
+    observation_dates (list):       Observation dates (years), the last one being the maturity
+    autocall_barrier (float):       Autocall barrier (fraction of reference, or list, one per date)
+    coupon_barrier (float):         Coupon barrier (fraction of reference)
+    coupon (float):                 Coupon per observation date (fraction of notional)
+    memory (bool):                  Whether missed coupons are paid later
+    protection_barrier (float):     Capital protection barrier at maturity (fraction of reference)
+    annual_vol (float):             Annual Volatility
+    free_rate (float):              Annual risk-free rate
+    div_yield (float):              Annual dividend yield
+    target_error (float):           Standard error the Monte Carlo price stops at
+    time_budget (float):            Wall-clock budget of the Monte Carlo price, in seconds (None for no limit)
+    max_sims (int):                 Maximum number of Monte Carlo simulations
+    normal_source (NormalSource):   Source of the normals of the Monte Carlo price (None: pseudo-random),
+                                    restarted on every price
+    """
+
+    def __init__(self):
+
+        # Every new instance of a note will be init with values for all its attributes
+        # (3 years, quarterly observations)
+
+        self.s0:                    float   = 100
+        self.reference:             float   = None
+        self.notional:              float   = 100
+        self.observation_dates:     list    = [0.25*i for i in range(1, 13)]
+        self.autocall_barrier:      float   = 1.0
+        self.coupon_barrier:        float   = 0.7
+        self.coupon:                float   = 0.02
+        self.memory:                bool    = True
+        self.protection_barrier:    float   = 0.6
+        self.annual_vol:            float   = 0.2
+        self.free_rate:             float   = 0.03
+        self.div_yield:             float   = 0.01
+        self.target_error:          float   = 0.01
+        self.time_budget:           float   = None
+        self.max_sims:              int     = 1_000_000
+        self.normal_source:         NormalSource = None
+
+
+    @classmethod
+    def reverse_convertible(cls, coupon: float, protection_barrier: float, maturity: float,
+        nr_coupons: int = 1):
+        """
+        Reverse Convertible: never called, coupons paid whatever the underlying (nr_coupons equally
+        spaced ones), notional back at maturity above the protection barrier
+        """
+
+        note = cls()
+        note.observation_dates = [maturity*(i + 1)/nr_coupons for i in range(nr_coupons)]
+        note.autocall_barrier = np.inf
+        note.coupon_barrier = 0.0
+        note.coupon = coupon
+        note.protection_barrier = protection_barrier
+
+        return note
+
+
+    def get_years_to_maturity(self) -> float:
+
+        return self.observation_dates[-1]
+
+
+    def price_result(self, rng: np.random.Generator = None) -> AutocallResult:
+        """
+        Monte Carlo price, with its standard error, the expected life and the call probabilities
+        """
+
+        reference = self.s0 if (self.reference is None) else self.reference
+        if (self.normal_source is not None):
+            self.normal_source.reset()
+
+        return mc_autocallable(self.s0, reference, self.notional, self.observation_dates, self.autocall_barrier,
+            self.coupon_barrier, self.coupon, self.memory, self.protection_barrier, self.annual_vol,
+            self.free_rate, self.div_yield, self.target_error, self.time_budget, self.max_sims, rng=rng,
+            normal_source=self.normal_source)
+
+
+    def price(self) -> float:
+        """
+        Monte Carlo price of the note
+        """
+
+        return self.price_result().price
+
+
+    def to_text(self):
+        memory = "Yes" if self.memory else "No"
+        return f"\
+            • Current Asset Price   {self.s0} €\n\
+            • Notional              {self.notional} €\n\
+            • Years to Maturity     {self.get_years_to_maturity()}\n\
+            • Observations          {len(self.observation_dates)}\n\
+            • Autocall Barrier      {self.autocall_barrier}\n\
+            • Coupon                {round(self.coupon*100,2)} % (barrier {self.coupon_barrier}, memory {memory})\n\
+            • Protection Barrier    {self.protection_barrier}\n\
+            • Annual Volatility     {round(self.annual_vol*100,2)}\n\
+            • Risk-free rate        {round(self.free_rate*100,2)}\n\
+            • Dividend Yield        {round(self.div_yield*100,2)}\n\
+        "
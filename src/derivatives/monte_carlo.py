@@ -0,0 +1,1052 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Monte Carlo engines for option pricing
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import NamedTuple, Callable
+
+import numpy as np
+
+from option_pricing import black_scholes, geometric_asian, PriceGreeks
+from sampling import NormalSource
+
+
+# Number of paths simulated at a time by the chunked driver
+MC_CHUNK_SIZE = 50_000
+# Number of paths of each independent random stream of the parallel driver
+MC_BLOCK_SIZE = 500_000
+# Longstaff-Schwartz: number of paths (sized for interactive use, ~0.3 s for a 3 year vanilla), exercise
+# dates per year and degree of the regression polynomials
+LSM_PATHS = 20_000
+LSM_DATES_PER_YEAR = 50
+LSM_DEGREE = 3
+# Longstaff-Schwartz with a normal source: maximum number of normals (assets x dates x paths, ~256 MB)
+# of the joint draw
+LSM_SOURCE_MAX_NORMALS = 2**25
+
+
+class MCResult(NamedTuple):
+    """
+    Result of a Monte Carlo run: price, its standard error and the number of paths actually simulated,
+    plus the variance reduction factors (variance per path of plain sampling over the one obtained) 
+    of the antithetic pairing and of the control variates
+    """
+    price: float
+    std_error: float
+    nr_paths: int
+    vr_antithetic: float = 1.0
+    vr_control: float = 1.0
+
+    @property
+    def variance_reduction(self) -> float:
+        """
+        Total variance reduction factor (how many times fewer paths than plain sampling are needed)
+        """
+        return self.vr_antithetic*self.vr_control
+
+
+class MCGreeks(NamedTuple):
+    """
+    Price and greeks estimated by Monte Carlo, their standard errors and the number of paths simulated
+    """
+    greeks: PriceGreeks
+    std_errors: PriceGreeks
+    nr_paths: int
+
+
+class RunningStats:
+    """
+    RunningStats
+
+    == Summary ==
+    Running mean and variance of a stream of samples (Welford), updated one chunk at a time: the mean
+    and sum of squared deviations of each chunk are merged into the running ones (pairwise update of
+    Chan et al.), so samples are never stored and the variance does not suffer from cancellation.
+    Samples with several columns (n x k) keep the mean of each column and the matrix of co-moments
+
+    == Attributes ==
+    count (int):        Number of samples seen
+    mean (float):       Running mean (array of k means for multi-column samples)
+    m2 (float):         Running sum of squared deviations from the mean (k x k co-moments)
+    """
+
+    def __init__(self):
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+
+    def update(self, samples: np.ndarray):
+        """
+        Adds a chunk of samples
+        """
+
+        if (samples.shape[0] == 0):
+            return
+
+        mean = samples.mean(axis=0)
+        deviations = samples - mean
+        self.merge(samples.shape[0], mean, deviations.T @ deviations)
+
+
+    def merge(self, count: int, mean: float, m2: float):
+        """
+        Adds the statistics of another set of samples (count, mean, sum of squared deviations)
+        """
+
+        if (count == 0):
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+
+        self.mean = self.mean + delta*count/total
+        self.m2 = self.m2 + m2 + np.multiply.outer(delta, delta)*self.count*count/total
+        self.count = total
+
+
+    @property
+    def variance(self) -> float:
+        """
+        Sample variance (covariance matrix for multi-column samples)
+        """
+
+        return self.m2/(self.count - 1) if (self.count > 1) else np.nan
+
+
+    @property
+    def std_error(self) -> float:
+        """
+        Standard error of the mean (of each column)
+        """
+
+        variance = self.variance
+        variance = np.diagonal(variance) if (np.ndim(variance) == 2) else variance
+
+        return np.sqrt(variance/self.count) if (self.count > 1) else np.nan
+
+
+def _control_variate_estimate(stats: RunningStats, control_means, column: int = 0) -> tuple:
+    """
+    Estimate of the mean of one column (the payoff by default) and variance per sample of the control
+    variate estimator, the controls being the last len(control_means) columns, with the optimal betas
+    (regression of the column on the controls) estimated from the running co-moments
+    """
+
+    if (stats.count < 2):
+        return np.nan, np.nan
+
+    mean, covariance = stats.mean, stats.variance
+
+    if (control_means is None) or (len(control_means) == 0):
+        return mean[column], covariance[column, column]
+
+    controls = slice(-len(control_means), None)
+    beta = np.linalg.lstsq(covariance[controls, controls], covariance[controls, column], rcond=None)[0]
+    price = mean[column] - beta @ (mean[controls] - np.asarray(control_means))
+    variance = covariance[column, column] - covariance[controls, column] @ beta
+
+    return price, max(variance, 0.0)
+
+
+def run_chunked(sampler: Callable[[int, np.random.Generator], np.ndarray], target_error: float = None,
+    time_budget: float = None, max_paths: int = 10_000_000, chunk_size: int = MC_CHUNK_SIZE,
+    rng: np.random.Generator = None, control_means=None) -> MCResult:
+    """
+    run_chunked
+
+    == Summary ==
+    Monte Carlo driver: draws the (discounted) payoff samples in chunks of chunk_size paths, keeping
+    only their running mean and variance, and stops as soon as the standard error is below
+    target_error, time_budget seconds have passed, or max_paths paths were simulated (whichever
+    comes first)
+
+    Variance reduction: the sampler can return antithetic legs (the payoffs of the paths driven by 
+    the normals z and -z, averaged into one sample per pair) and control variates (discounted 
+    payoffs with known expectations, control_means). The payoff is then corrected by the controls 
+    with the optimal betas, estimated on the fly from the running co-moments
+
+    == Args ==
+    sampler (Callable):     sampler(nr_paths, rng) -> array with the discounted payoff of each path, or
+                            array (legs x paths x (1 + controls)) with the payoff and the controls of 
+                            each path, for each antithetic leg
+    target_error (float):   Standard error to reach (None to ignore)
+    time_budget (float):    Wall-clock budget, in seconds (None to ignore)
+    max_paths (int):        Maximum number of paths
+    chunk_size (int):       Number of paths per chunk
+    rng (Generator):        Random number generator (a new one if None)
+    control_means (array):  Expected value of each control (None if the sampler has no controls)
+
+    == Returns ==
+    (MCResult) Price, standard error and number of paths used
+    """
+
+    rng = np.random.default_rng() if (rng is None) else rng
+    # Samples (payoff and controls, averaged over the legs), and payoffs of single paths (first leg)
+    stats = RunningStats()
+    plain = RunningStats()
+    nr_paths = 0
+    start = time.perf_counter()
+
+    nr_legs = 1
+
+    while (nr_paths < max_paths):
+
+        nr_legs = _accumulate(stats, plain, sampler(min(chunk_size, max_paths - nr_paths), rng))
+        nr_paths = nr_legs*stats.count
+
+        if _should_stop(stats, control_means, target_error, time_budget, start):
+            break
+
+    return _mc_result(stats, plain, nr_legs, control_means)
+
+
+def _accumulate(stats: RunningStats, plain: RunningStats, legs: np.ndarray) -> int:
+    """
+    Adds the output of a sampler to the running statistics of the samples (legs averaged) and of the
+    single paths (first leg). Returns the number of legs
+    """
+
+    legs = np.asarray(legs)
+    legs = legs[None, :, None] if (legs.ndim == 1) else legs
+
+    stats.update(legs.mean(axis=0) if (legs.shape[0] > 1) else legs[0])
+    plain.update(legs[0, :, 0])
+
+    return legs.shape[0]
+
+
+def _should_stop(stats: RunningStats, control_means, target_error: float, time_budget: float, 
+    start: float) -> bool:
+    """
+    Whether the standard error target or the wall-clock budget are reached
+    """
+
+    if (target_error is not None):
+        _, variance = _control_variate_estimate(stats, control_means)
+        if (np.sqrt(variance/stats.count) <= target_error):
+            return True
+
+    return (time_budget is not None) and (time.perf_counter() - start >= time_budget)
+
+
+def _mc_result(stats: RunningStats, plain: RunningStats, nr_legs: int, control_means) -> MCResult:
+    """
+    Final estimate of a run, with the variance reduction factors
+    """
+
+    price, variance = _control_variate_estimate(stats, control_means)
+    std_error = np.sqrt(variance/stats.count)
+
+    # Variance per path: plain sampling, antithetic pairs (a sample is worth nr_legs paths), with controls
+    sample_variance = stats.variance[0, 0] if (stats.count > 1) else np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vr_antithetic = plain.variance/(sample_variance*nr_legs) if (nr_legs > 1) else 1.0
+        vr_control = sample_variance/variance if (control_means is not None) else 1.0
+
+    return MCResult(float(price), float(std_error), nr_legs*stats.count, float(vr_antithetic), 
+        float(vr_control))
+
+
+def _run_block(sampler: Callable, seed: np.random.SeedSequence, nr_paths: int, chunk_size: int) -> tuple:
+    """
+    Simulates one block of paths with its own random stream (worker of run_parallel). Returns only
+    the running statistics of the block and its number of legs
+    """
+
+    rng = np.random.default_rng(seed)
+    stats = RunningStats()
+    plain = RunningStats()
+    nr_legs = 1
+
+    while (nr_legs*stats.count < nr_paths):
+        nr_legs = _accumulate(stats, plain, sampler(min(chunk_size, nr_paths - nr_legs*stats.count), rng))
+
+    return stats, plain, nr_legs
+
+
+def run_parallel(sampler: Callable[[int, np.random.Generator], np.ndarray], target_error: float = None,
+    time_budget: float = None, max_paths: int = 10_000_000, seed=None, nr_workers: int = None,
+    block_size: int = MC_BLOCK_SIZE, chunk_size: int = MC_CHUNK_SIZE, control_means=None) -> MCResult:
+    """
+    run_parallel
+
+    == Summary ==
+    Multi-process version of run_chunked. The paths are split in blocks of block_size paths, each with
+    its own random stream (numpy.random.SeedSequence(seed).spawn), simulated by a pool of nr_workers
+    processes. Workers only return the running statistics of their blocks, which are merged in block
+    order, and the stopping rules are checked after each block in that order: for a given seed, the
+    result is the same (bit for bit) whatever the number of workers
+
+    The sampler must be picklable (a module level function, or a functools.partial of one)
+
+    == Args ==
+    sampler (Callable):     sampler(nr_paths, rng), see run_chunked
+    target_error (float):   Standard error to reach (None to ignore)
+    time_budget (float):    Wall-clock budget, in seconds (None to ignore, breaks reproducibility)
+    max_paths (int):        Maximum number of paths
+    seed (int):             Seed of the random streams (None for a random one)
+    nr_workers (int):       Number of processes (all the cores if None, 1 runs in this process)
+    block_size (int):       Number of paths per block
+    chunk_size (int):       Number of paths per chunk, inside each block
+    control_means (array):  Expected value of each control (None if the sampler has no controls)
+
+    == Returns ==
+    (MCResult) Price, standard error and number of paths used
+    """
+
+    nr_workers = os.cpu_count() if (nr_workers is None) else nr_workers
+    sizes = [block_size]*(max_paths//block_size) + ([max_paths % block_size] if (max_paths % block_size) else [])
+    blocks = zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)
+    stats = RunningStats()
+    plain = RunningStats()
+    nr_legs = 1
+    start = time.perf_counter()
+
+    if (nr_workers == 1):
+        results = (_run_block(sampler, block_seed, size, chunk_size) for block_seed, size in blocks)
+        executor = None
+    else:
+        # At most two blocks per worker in flight, consumed in block order
+        executor = ProcessPoolExecutor(nr_workers)
+        pending = deque(executor.submit(_run_block, sampler, block_seed, size, chunk_size) 
+            for block_seed, size in (next(blocks) for _ in range(min(2*nr_workers, len(sizes)))))
+
+        def in_order():
+            while pending:
+                result = pending.popleft().result()
+                block = next(blocks, None)
+                if (block is not None):
+                    pending.append(executor.submit(_run_block, sampler, block[0], block[1], chunk_size))
+                yield result
+
+        results = in_order()
+
+    try:
+        for block_stats, block_plain, nr_legs in results:
+
+            stats.merge(block_stats.count, block_stats.mean, block_stats.m2)
+            plain.merge(block_plain.count, block_plain.mean, block_plain.m2)
+
+            if _should_stop(stats, control_means, target_error, time_budget, start):
+                break
+    finally:
+        if (executor is not None):
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return _mc_result(stats, plain, nr_legs, control_means)
+
+
+def draw_normals(nr_dims: int, nr_paths: int, rng: np.random.Generator, 
+    normal_source: NormalSource = None) -> np.ndarray:
+    """
+    Standard normals (nr_dims x nr_paths): the next draws of normal_source if there is one (e.g. a 
+    Sobol sequence, see sampling), pseudo-random ones from rng otherwise
+    """
+
+    if (normal_source is None):
+        return rng.standard_normal((nr_dims, nr_paths))
+
+    return normal_source.normals(nr_dims, nr_paths)
+
+
+def terminal_prices(s0: float, maturity: float, annual_vol: float, free_rate: float, div_yield: float,
+    nr_sims: int, rng: np.random.Generator = None, normal_source: NormalSource = None) -> np.ndarray:
+    """
+    terminal_prices
+
+    == Summary ==
+    Simulates the price of the underlying at maturity, sampled directly with the exact lognormal
+    step of the Geometric Brownian Motion (no intermediate dates are needed for EU payoffs).
+    Only one array of nr_sims floats is allocated, and updated in place
+
+    == Args ==
+    s0 (float):             Current value of the underlying
+    maturity (float):       Number of years until maturity
+    annual_vol (float):     Annual volatility
+    free_rate (float):      Annual risk free rate
+    div_yield (float):      Annual Dividend yield
+    nr_sims (int):          Number of simulations
+    rng (Generator):        Random number generator (a new one if None)
+    normal_source (NormalSource): Source of the normals (None: rng)
+
+    == Returns ==
+    (np.ndarray) Simulated prices of the underlying at maturity
+    """
+
+    rng = np.random.default_rng() if (rng is None) else rng
+
+    return _exact_gbm(draw_normals(1, nr_sims, rng, normal_source)[0], s0, maturity, annual_vol, free_rate, 
+        div_yield)
+
+
+def _exact_gbm(normals: np.ndarray, s0: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float) -> np.ndarray:
+    """
+    Turns standard normals into prices of the underlying at maturity (exact lognormal step), in place
+    """
+
+    normals *= annual_vol*np.sqrt(maturity)
+    normals += (free_rate - div_yield - (annual_vol**2)/2)*maturity
+    np.exp(normals, out=normals)
+    normals *= s0
+
+    return normals
+
+
+def mc_asset_or_nothing(s0: float, strike: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, call: bool = True, nr_sims: int = 10_000, rng: np.random.Generator = None) -> float:
+    """
+    mc_asset_or_nothing
+
+    == Summary ==
+    Computes the Price of an EU Asset-Or-Nothing option by Monte Carlo, on terminal prices only
+    (see terminal_prices), using O(nr_sims) memory
+
+    == Args ==
+    s0 (float):             Current value of the underlying
+    strike (float):         Strike price
+    maturity (float):       Number of years until maturity
+    annual_vol (float):     Annual volatility
+    free_rate (float):      Annual risk free rate
+    div_yield (float):      Annual Dividend yield
+    call (bool):            True for Call options (pays St if St > X), False for Put options (St if St < X)
+    nr_sims (int):          Number of simulations
+    rng (Generator):        Random number generator (a new one if None)
+
+    == Returns ==
+    (float) Price of the option
+    """
+
+    prices = terminal_prices(s0, maturity, annual_vol, free_rate, div_yield, nr_sims, rng)
+    in_the_money = (prices > strike) if call else (prices < strike)
+
+    return np.exp(-free_rate*maturity)*prices.sum(where=in_the_money)/nr_sims
+
+
+def asset_or_nothing_sampler(s0: float, strike: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, call: bool = True, antithetic: bool = False, control_variates: bool = False,
+    normal_source: NormalSource = None) -> Callable[[int, np.random.Generator], np.ndarray]:
+    """
+    Sampler (see run_chunked) of the discounted payoff of an EU Asset-Or-Nothing option.
+    With antithetic, the paths come in pairs (z, -z). With control_variates, each path also carries 
+    the discounted underlying and the discounted vanilla payoff (see asset_or_nothing_control_means).
+    The normals come from normal_source if there is one (the rng of the driver is then not used)
+    """
+
+    return partial(_asset_or_nothing_samples, s0=s0, strike=strike, maturity=maturity, annual_vol=annual_vol,
+        free_rate=free_rate, div_yield=div_yield, call=call, antithetic=antithetic, 
+        control_variates=control_variates, normal_source=normal_source)
+
+
+def _asset_or_nothing_samples(nr_paths: int, rng: np.random.Generator, s0: float, strike: float, 
+    maturity: float, annual_vol: float, free_rate: float, div_yield: float, call: bool, antithetic: bool, 
+    control_variates: bool, normal_source: NormalSource = None) -> np.ndarray:
+    """
+    Samples of asset_or_nothing_sampler (legs x paths x columns)
+    """
+
+    discount = np.exp(-free_rate*maturity)
+    nr_legs = 2 if antithetic else 1
+
+    normals = draw_normals(1, -(-nr_paths//nr_legs), rng, normal_source)[0]
+    normals = np.concatenate((normals, -normals)) if antithetic else normals
+    prices = _exact_gbm(normals, s0, maturity, annual_vol, free_rate, div_yield).reshape(nr_legs, -1)
+    prices *= discount
+
+    if not control_variates:
+        prices *= ((prices > strike*discount) if call else (prices < strike*discount))
+        return prices[..., None]
+
+    samples = np.empty(prices.shape + (3,))
+    samples[..., 1] = prices
+    np.subtract(prices, strike*discount, out=samples[..., 2])
+    samples[..., 2] *= (1 if call else -1)
+    np.maximum(samples[..., 2], 0, out=samples[..., 2])
+    np.multiply(prices, samples[..., 2] > 0, out=samples[..., 0])
+
+    return samples
+
+
+def asset_or_nothing_control_means(s0: float, strike: float, maturity: float, annual_vol: float, 
+    free_rate: float, div_yield: float, call: bool = True) -> list:
+    """
+    Expected values of the controls of asset_or_nothing_sampler: the discounted underlying (s0*e^(-qT)) 
+    and the vanilla option with the same strike (Black-Scholes)
+    """
+
+    return [s0*np.exp(-div_yield*maturity), 
+        black_scholes(s0, strike, annual_vol, maturity, free_rate, div_yield, call=call)]
+
+
+def mc_asset_or_nothing_chunked(s0: float, strike: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, call: bool = True, target_error: float = None, time_budget: float = None,
+    max_paths: int = 10_000_000, chunk_size: int = MC_CHUNK_SIZE, rng: np.random.Generator = None,
+    antithetic: bool = False, control_variates: bool = False, nr_workers: int = 1, seed=None,
+    normal_source: NormalSource = None) -> MCResult:
+    """
+    mc_asset_or_nothing_chunked
+
+    == Summary ==
+    Computes the Price of an EU Asset-Or-Nothing option by Monte Carlo, simulating as many paths as
+    needed to reach target_error (see run_chunked), optionally with antithetic pairs and with the
+    discounted underlying and the vanilla option (known in closed form) as control variates.
+    With more than one worker (or a seed), the paths are simulated by run_parallel instead, unless
+    the normals come from normal_source (a single stream, always consumed by run_chunked)
+
+    == Returns ==
+    (MCResult) Price, standard error and number of paths used
+    """
+
+    sampler = asset_or_nothing_sampler(s0, strike, maturity, annual_vol, free_rate, div_yield, call, 
+        antithetic, control_variates, normal_source)
+    control_means = asset_or_nothing_control_means(s0, strike, maturity, annual_vol, free_rate, div_yield, 
+        call) if control_variates else None
+
+    if (normal_source is None) and ((nr_workers != 1) or (seed is not None)):
+        return run_parallel(sampler, target_error, time_budget, max_paths, seed, nr_workers, 
+            chunk_size=chunk_size, control_means=control_means)
+
+    return run_chunked(sampler, target_error, time_budget, max_paths, chunk_size, rng, control_means)
+
+
+def _asset_or_nothing_greek_samples(nr_paths: int, rng: np.random.Generator, s0: float, strike: float, 
+    maturity: float, annual_vol: float, free_rate: float, div_yield: float, call: bool, 
+    antithetic: bool, control_variates: bool = False, normal_source: NormalSource = None) -> np.ndarray:
+    """
+    Samples of the price and greek estimators of an EU Asset-Or-Nothing option (legs x paths x 6), 
+    followed by the controls of asset_or_nothing_sampler with control_variates (legs x paths x 8), 
+    see mc_asset_or_nothing_greeks
+    """
+
+    nr_legs = 2 if antithetic else 1
+    sqrt_t = np.sqrt(maturity)
+    vol_sqrt_t = annual_vol*sqrt_t
+
+    z = draw_normals(1, -(-nr_paths//nr_legs), rng, normal_source)[0]
+    z = np.concatenate((z, -z)) if antithetic else z
+    prices = _exact_gbm(z.copy(), s0, maturity, annual_vol, free_rate, div_yield)
+
+    # f: discounted payoff (vanilla part + digital part), d: discounted digital part
+    in_the_money = (prices > strike) if call else (prices < strike)
+    f = np.exp(-free_rate*maturity)*prices*in_the_money
+    d = np.exp(-free_rate*maturity)*strike*in_the_money
+
+    # Likelihood ratio weights of s0 (first and second order)
+    w1 = z/(s0*vol_sqrt_t)
+    w2 = (z*z - 1)/((s0*vol_sqrt_t)**2) - z/((s0**2)*vol_sqrt_t)
+
+    samples = np.empty((8 if control_variates else 6, z.size))
+    samples[0] = f
+    samples[1] = f/s0 + d*w1
+    samples[2] = f*w1/s0 - f/(s0**2) + d*w2
+    samples[3] = f*(sqrt_t*z - annual_vol*maturity) + d*((z*z - 1)/annual_vol - z*sqrt_t)
+    samples[4] = d*z*sqrt_t/annual_vol
+    # Theta from the Black-Scholes equation, on the estimators above
+    samples[5] = free_rate*samples[0] - (free_rate - div_yield)*s0*samples[1] - \
+        ((annual_vol*s0)**2)*samples[2]/2
+
+    if control_variates:
+        # Discounted underlying and vanilla payoff
+        samples[6] = np.exp(-free_rate*maturity)*prices
+        samples[7] = (samples[6]*in_the_money - d)*(1 if call else -1)
+
+    return samples.T.reshape(nr_legs, -1, samples.shape[0])
+
+
+def mc_asset_or_nothing_greeks(s0: float, strike: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, call: bool = True, target_error: float = None, time_budget: float = None,
+    max_paths: int = 1_000_000, chunk_size: int = MC_CHUNK_SIZE, rng: np.random.Generator = None,
+    antithetic: bool = False, control_variates: bool = False, normal_source: NormalSource = None) -> MCGreeks:
+    """
+    mc_asset_or_nothing_greeks
+
+    == Summary ==
+    Computes the Price and the greeks of an EU Asset-Or-Nothing option by Monte Carlo, all from the 
+    same simulated paths (no bumping, no second path set). The payoff St*1{St > X} is split into a
+    vanilla part (St - X)*1{St > X}, differentiated pathwise, and a digital part X*1{St > X}, whose
+    discontinuity needs likelihood ratio weights (score of the lognormal density):
+    - Delta: pathwise 1{St > X}*St/s0, and LR weight Z/(s0*vol*sqrt(T)) on the digital
+    - Gamma: LR weight on the pathwise delta, and the second order LR weight on the digital
+    - Vega: pathwise St*(sqrt(T)*Z - vol*T), and LR weight (Z^2 - 1)/vol - Z*sqrt(T) on the digital
+    - Rho: the pathwise and LR terms add up to the digital times Z*sqrt(T)/vol
+    - Theta: from the Black-Scholes equation, r*V - (r-q)*s0*Delta - (vol*s0)^2*Gamma/2
+    (puts: same decomposition, with the indicator 1{St < X})
+    With control_variates, every estimator is corrected by the discounted underlying and the vanilla
+    option (as in mc_asset_or_nothing_chunked), each with its own optimal betas, so the price is the 
+    variance reduced one and the greeks come from the same run. Theta, a linear combination of the 
+    other columns, stays consistent with them.
+    The loop and stopping rules are the ones of run_chunked, on the standard error of the price
+
+    == Args ==
+    s0 (float):             Current value of the underlying
+    strike (float):         Strike price
+    maturity (float):       Number of years until maturity
+    annual_vol (float):     Annual volatility
+    free_rate (float):      Annual risk free rate
+    div_yield (float):      Annual Dividend yield
+    call (bool):            True for Call options, False for Put options
+    target_error (float):   Standard error of the price to reach (None to ignore)
+    time_budget (float):    Wall-clock budget, in seconds (None to ignore)
+    max_paths (int):        Maximum number of paths
+    chunk_size (int):       Number of paths per chunk
+    rng (Generator):        Random number generator (a new one if None)
+    antithetic (bool):      Whether the paths come in antithetic pairs
+    control_variates (bool):Whether the estimators are corrected by the control variates
+    normal_source (NormalSource): Source of the normals (None: rng)
+
+    == Returns ==
+    (MCGreeks) Price and greeks, their standard errors and the number of paths used
+    """
+
+    rng = np.random.default_rng() if (rng is None) else rng
+    sampler = partial(_asset_or_nothing_greek_samples, s0=s0, strike=strike, maturity=maturity, 
+        annual_vol=annual_vol, free_rate=free_rate, div_yield=div_yield, call=call, antithetic=antithetic, 
+        control_variates=control_variates, normal_source=normal_source)
+    control_means = asset_or_nothing_control_means(s0, strike, maturity, annual_vol, free_rate, div_yield, 
+        call) if control_variates else None
+    stats = RunningStats()
+    plain = RunningStats()
+    nr_legs = 1
+    start = time.perf_counter()
+
+    while (nr_legs*stats.count < max_paths):
+
+        nr_legs = _accumulate(stats, plain, sampler(min(chunk_size, max_paths - nr_legs*stats.count), rng))
+
+        if _should_stop(stats, control_means, target_error, time_budget, start):
+            break
+
+    estimates = [_control_variate_estimate(stats, control_means, column) for column in range(6)]
+
+    return MCGreeks(PriceGreeks(*(float(mean) for mean, _ in estimates)), 
+        PriceGreeks(*(float(np.sqrt(variance/stats.count)) for _, variance in estimates)), nr_legs*stats.count)
+
+
+class PathPayoff:
+    """
+    PathPayoff
+
+    == Summary ==
+    Payoff of a path-dependent EU option, for the streaming path engine (see path_sampler): instead 
+    of whole paths, it keeps a few running statistics per path (state), updated at every observation
+    date, so memory is O(paths) whatever the number of steps.
+    Subclasses define the state, its update, the payoff (plus control variates) and the expected 
+    values of the controls
+    """
+
+    def start(self, prices: np.ndarray) -> list:
+        """
+        (list) Initial state of each path, from the current prices (s0)
+        """
+        return []
+
+    def observe(self, state: list, prices: np.ndarray):
+        """
+        Updates the state (in place) with the prices of the next observation date
+        """
+        pass
+
+    def samples(self, state: list, prices: np.ndarray) -> np.ndarray:
+        """
+        (np.ndarray) Payoff of each path, and its controls (paths x (1 + controls)), at maturity
+        """
+        raise NotImplementedError("Not Implemented Error")
+
+    def control_means(self, s0: float, maturity: float, annual_vol: float, free_rate: float, 
+        div_yield: float, nr_steps: int) -> list:
+        """
+        (list) Expected discounted value of each control (None if there are none)
+        """
+        return None
+
+
+def _vanilla_payoff(prices: np.ndarray, strike: float, call: bool) -> np.ndarray:
+
+    return np.maximum(prices - strike, 0) if call else np.maximum(strike - prices, 0)
+
+
+class AsianPayoff(PathPayoff):
+    """
+    Option on the average of the underlying over the observation dates: running sum of the prices
+    (arithmetic) and of their logs (geometric). The arithmetic average uses the geometric one as 
+    control variate (closed form, see geometric_asian)
+    """
+
+    def __init__(self, strike: float, call: bool = True, geometric: bool = False):
+
+        self.strike = strike
+        self.call = call
+        self.geometric = geometric
+
+    def start(self, prices):
+
+        return [np.zeros_like(prices), np.zeros_like(prices), 0]
+
+    def observe(self, state, prices):
+
+        state[0] += prices
+        state[1] += np.log(prices)
+        state[2] += 1
+
+    def samples(self, state, prices):
+
+        geometric = _vanilla_payoff(np.exp(state[1]/state[2]), self.strike, self.call)
+        if self.geometric:
+            return geometric[:, None]
+
+        arithmetic = _vanilla_payoff(state[0]/state[2], self.strike, self.call)
+        return np.column_stack((arithmetic, geometric))
+
+    def control_means(self, s0, maturity, annual_vol, free_rate, div_yield, nr_steps):
+
+        if self.geometric:
+            return None
+
+        return [geometric_asian(s0, self.strike, maturity, annual_vol, free_rate, div_yield, nr_steps, self.call)]
+
+
+class BarrierPayoff(PathPayoff):
+    """
+    Vanilla option activated (knock-in) or cancelled (knock-out) when the underlying reaches the 
+    barrier on an observation date (or already is beyond it): running knocked flag. The vanilla 
+    option is the control variate (knock-in + knock-out = vanilla)
+    """
+
+    def __init__(self, strike: float, barrier: float, call: bool = True, up: bool = True, 
+        knock_in: bool = False):
+
+        self.strike = strike
+        self.barrier = barrier
+        self.call = call
+        self.up = up
+        self.knock_in = knock_in
+
+    def _crossed(self, prices):
+
+        return (prices >= self.barrier) if self.up else (prices <= self.barrier)
+
+    def start(self, prices):
+
+        return [self._crossed(prices)]
+
+    def observe(self, state, prices):
+
+        state[0] |= self._crossed(prices)
+
+    def samples(self, state, prices):
+
+        vanilla = _vanilla_payoff(prices, self.strike, self.call)
+        alive = state[0] if self.knock_in else ~state[0]
+
+        return np.column_stack((vanilla*alive, vanilla))
+
+    def control_means(self, s0, maturity, annual_vol, free_rate, div_yield, nr_steps):
+
+        return [black_scholes(s0, self.strike, annual_vol, maturity, free_rate, div_yield, call=self.call)]
+
+
+class LookbackPayoff(PathPayoff):
+    """
+    Floating strike lookback option: pays St - min(S) (Call) or max(S) - St (Put), the extreme being
+    taken over the observation dates (and s0): running minimum or maximum. The discounted underlying 
+    is the control variate
+    """
+
+    def __init__(self, call: bool = True):
+
+        self.call = call
+
+    def start(self, prices):
+
+        return [prices.copy()]
+
+    def observe(self, state, prices):
+
+        (np.minimum if self.call else np.maximum)(state[0], prices, out=state[0])
+
+    def samples(self, state, prices):
+
+        return np.column_stack(((prices - state[0]) if self.call else (state[0] - prices), prices))
+
+    def control_means(self, s0, maturity, annual_vol, free_rate, div_yield, nr_steps):
+
+        return [s0*np.exp(-div_yield*maturity)]
+
+
+def _path_samples(nr_paths: int, rng: np.random.Generator, payoff: PathPayoff, s0: float, maturity: float, 
+    annual_vol: float, free_rate: float, div_yield: float, nr_steps: int, antithetic: bool,
+    normal_source: NormalSource = None) -> np.ndarray:
+    """
+    Samples of path_sampler (legs x paths x columns)
+    """
+
+    nr_legs = 2 if antithetic else 1
+    half = -(-nr_paths//nr_legs)
+    delta_t = maturity/nr_steps
+    drift = (free_rate - div_yield - (annual_vol**2)/2)*delta_t
+    diffusion = annual_vol*np.sqrt(delta_t)
+
+    prices = np.full(nr_legs*half, float(s0))
+    factors = np.empty_like(prices)
+    state = payoff.start(prices)
+
+    # A normal source gives the normals of all the steps of a path at once (steps x paths)
+    normals = None if (normal_source is None) else normal_source.normals(nr_steps, half)
+
+    # Exact lognormal steps, one observation date at a time
+    for step in range(nr_steps):
+        factors[:half] = rng.standard_normal(half) if (normals is None) else normals[step]
+        if antithetic:
+            np.negative(factors[:half], out=factors[half:])
+        factors *= diffusion
+        factors += drift
+        np.exp(factors, out=factors)
+        prices *= factors
+        payoff.observe(state, prices)
+
+    samples = payoff.samples(state, prices)
+    samples *= np.exp(-free_rate*maturity)
+
+    return samples.reshape(nr_legs, half, -1)
+
+
+def path_sampler(payoff: PathPayoff, s0: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, nr_steps: int, antithetic: bool = False, 
+    normal_source: NormalSource = None) -> Callable[[int, np.random.Generator], np.ndarray]:
+    """
+    Sampler (see run_chunked) of a path-dependent payoff: streaming engine stepping the Geometric 
+    Brownian Motion forward over nr_steps equal observation dates (exact lognormal steps), keeping only
+    the current prices and the running statistics of the payoff. With a normal_source, the normals of
+    a chunk are drawn for all the steps at once (memory O(nr_steps x chunk), as a Sobol point holds 
+    the whole path)
+    """
+
+    return partial(_path_samples, payoff=payoff, s0=s0, maturity=maturity, annual_vol=annual_vol, 
+        free_rate=free_rate, div_yield=div_yield, nr_steps=nr_steps, antithetic=antithetic, 
+        normal_source=normal_source)
+
+
+def mc_path_dependent(payoff: PathPayoff, s0: float, maturity: float, annual_vol: float, free_rate: float,
+    div_yield: float, nr_steps: int, target_error: float = None, time_budget: float = None, 
+    max_paths: int = 1_000_000, chunk_size: int = MC_CHUNK_SIZE, rng: np.random.Generator = None,
+    antithetic: bool = False, control_variates: bool = True, nr_workers: int = 1, seed=None,
+    normal_source: NormalSource = None) -> MCResult:
+    """
+    mc_path_dependent
+
+    == Summary ==
+    Computes the Price of a path-dependent EU option by Monte Carlo, with the streaming path engine
+    (see path_sampler), the controls of the payoff and the chunked (or parallel) driver
+
+    == Args ==
+    payoff (PathPayoff):    Payoff of the option
+    s0 (float):             Current value of the underlying
+    maturity (float):       Number of years until maturity
+    annual_vol (float):     Annual volatility
+    free_rate (float):      Annual risk free rate
+    div_yield (float):      Annual Dividend yield
+    nr_steps (int):         Number of observation dates (equally spaced, the last one at maturity)
+    target_error (float):   Standard error to reach (None to ignore)
+    time_budget (float):    Wall-clock budget, in seconds (None to ignore)
+    max_paths (int):        Maximum number of paths
+    chunk_size (int):       Number of paths per chunk
+    rng (Generator):        Random number generator (a new one if None)
+    antithetic (bool):      Whether the paths come in antithetic pairs
+    control_variates (bool):Whether the controls of the payoff are used
+    nr_workers (int):       Number of processes (see run_parallel)
+    seed (int):             Seed of run_parallel
+    normal_source (NormalSource): Source of the normals (None: rng, or the streams of run_parallel). 
+                            A source is a single stream, its paths are always simulated by run_chunked
+
+    == Returns ==
+    (MCResult) Price, standard error and number of paths used
+    """
+
+    sampler = path_sampler(payoff, s0, maturity, annual_vol, free_rate, div_yield, nr_steps, antithetic, 
+        normal_source)
+    control_means = payoff.control_means(s0, maturity, annual_vol, free_rate, div_yield, nr_steps)
+
+    if (control_means is not None) and not control_variates:
+        # Drop the control columns
+        sampler = partial(_payoff_only, sampler)
+        control_means = None
+
+    if (normal_source is None) and ((nr_workers != 1) or (seed is not None)):
+        return run_parallel(sampler, target_error, time_budget, max_paths, seed, nr_workers, 
+            chunk_size=chunk_size, control_means=control_means)
+
+    return run_chunked(sampler, target_error, time_budget, max_paths, chunk_size, rng, control_means)
+
+
+def _payoff_only(sampler: Callable, nr_paths: int, rng: np.random.Generator) -> np.ndarray:
+
+    return sampler(nr_paths, rng)[..., :1]
+
+
+def vanilla_exercise(prices: np.ndarray, strike: float, call: bool = True) -> np.ndarray:
+    """
+    Exercise value of a vanilla option on the first underlying (prices: paths x assets)
+    """
+
+    return _vanilla_payoff(prices[:, 0], strike, call)
+
+
+def _lsm_powers(x: np.ndarray, degree: int) -> np.ndarray:
+    """
+    Powers 1 to degree of every column of x (paths x (columns*degree)), by repeated products
+    """
+
+    powers = [x]
+    for _ in range(1, degree):
+        powers.append(powers[-1]*x)
+
+    return np.hstack(powers)
+
+
+def _lsm_basis(prices: np.ndarray, s0: np.ndarray, exercise: np.ndarray, degree: int) -> np.ndarray:
+    """
+    Regressors of the continuation value: powers (up to degree) of the performance of each underlying,
+    and the exercise value itself (paths x regressors). With several underlyings, also the pairwise
+    products of the performances and the powers of their minimum, maximum and mean (the basket-level 
+    quantities Worst-Of, Best-Of and Basket payoffs depend on). Performances are centred at 1, which
+    spans the same polynomials but keeps the regression well conditioned
+    """
+
+    performances = prices/s0 - 1
+    nr_assets = prices.shape[1]
+    blocks = [np.ones((prices.shape[0], 1)), exercise[:, None], _lsm_powers(performances, degree)]
+
+    if (nr_assets > 1):
+        first, second = np.triu_indices(nr_assets, k=1)
+        levels = np.column_stack((performances.min(axis=1), performances.max(axis=1), performances.mean(axis=1)))
+        blocks += [performances[:, first]*performances[:, second], _lsm_powers(levels, degree)]
+
+    return np.hstack(blocks)
+
+
+def longstaff_schwartz(exercise_payoff: Callable[[np.ndarray], np.ndarray], s0, annual_vols, div_yields,
+    free_rate: float, maturity: float, nr_dates: int, nr_paths: int = LSM_PATHS, 
+    rng: np.random.Generator = None, cholesky: np.ndarray = None, degree: int = LSM_DEGREE, 
+    antithetic: bool = True, normal_source: NormalSource = None) -> MCResult:
+    """
+    longstaff_schwartz
+
+    == Summary ==
+    Computes the Price of a Bermudan option (American, as nr_dates grows), exercisable on nr_dates
+    equally spaced dates up to maturity, on one or several (correlated) underlyings, by Least-Squares 
+    Monte Carlo (Longstaff-Schwartz).
+    The Brownian motions are simulated backwards in time with a Brownian bridge: the terminal value 
+    first, then each date conditional on the next one (W_t = t/u*W_u + sqrt(t*(u - t)/u)*Z), so that
+    the backward induction only ever holds the current time slice and the vector of cash flows. 
+    On each date, the continuation value of the in-the-money paths is regressed (one least-squares 
+    solve) on polynomials of the performances and on the exercise value, and those paths exercise 
+    where the exercise value beats it.
+    With a normal_source, the normals of a whole path come from one draw of the source (assets x dates
+    dimensions, so each underlying gets its own block of the time steps of the bridge of a Sobol source):
+    the terminal value is the sum of the increments, and each date back removes the last increment.
+    The draw is joint because the bridge of a Sobol source spans all the dates of a path (drawing each
+    date on its own would reuse the same few dimensions for every date), so that case holds 
+    assets x dates x paths normals and raises a ValueError above LSM_SOURCE_MAX_NORMALS; without a 
+    normal_source, only the current time slice is drawn
+
+    == Args ==
+    exercise_payoff (Callable): exercise_payoff(prices) -> exercise value of each path (prices: paths x assets)
+    s0 (array):                 Current value of each underlying
+    annual_vols (array):        Annual volatility of each underlying
+    div_yields (array):         Annual dividend yield of each underlying
+    free_rate (float):          Annual risk free rate
+    maturity (float):           Number of years until maturity
+    nr_dates (int):             Number of exercise dates (the last one at maturity)
+    nr_paths (int):             Number of paths
+    rng (Generator):            Random number generator (a new one if None)
+    cholesky (np.ndarray):      Cholesky factor of the correlation of the underlyings (None if independent)
+    degree (int):               Degree of the regression polynomials
+    antithetic (bool):          Whether the paths come in antithetic pairs
+    normal_source (NormalSource): Source of the normals (None: rng)
+
+    == Returns ==
+    (MCResult) Price, standard error (of the cash flows, given the exercise policy) and number of paths
+    """
+
+    rng = np.random.default_rng() if (rng is None) else rng
+    s0, annual_vols, div_yields = (np.atleast_1d(np.asarray(x, dtype=float)) for x in 
+        np.broadcast_arrays(s0, annual_vols, div_yields))
+    nr_assets = s0.size
+    nr_legs = 2 if antithetic else 1
+    half = -(-nr_paths//nr_legs)
+
+    def correlated(z: np.ndarray) -> np.ndarray:
+        z = z if (cholesky is None) else z @ cholesky.T
+        return np.concatenate((z, -z)) if antithetic else z
+
+    delta_t = maturity/nr_dates
+    drift = free_rate - div_yields - (annual_vols**2)/2
+    step_discount = np.exp(-free_rate*delta_t)
+
+    if (normal_source is not None) and (nr_assets*nr_dates*half > LSM_SOURCE_MAX_NORMALS):
+        raise ValueError("longstaff_schwartz: A normal_source draws assets x dates x paths normals at once, "
+            f"above LSM_SOURCE_MAX_NORMALS ({LSM_SOURCE_MAX_NORMALS}): use fewer dates or paths, or no normal_source")
+
+    # Increments of every date of the paths, from the normal source (assets x dates x paths)
+    increments = None if (normal_source is None) else \
+        normal_source.normals(nr_assets*nr_dates, half).reshape(nr_assets, nr_dates, half)
+
+    # Maturity
+    if (increments is None):
+        brownian = correlated(rng.standard_normal((half, nr_assets)))*np.sqrt(maturity)
+    else:
+        brownian = correlated(increments.sum(axis=1).T)*np.sqrt(delta_t)
+    prices = s0*np.exp(drift*maturity + annual_vols*brownian)
+    cash_flows = exercise_payoff(prices)
+
+    for k in range(nr_dates - 1, 0, -1):
+
+        time_k, time_next = k*delta_t, (k + 1)*delta_t
+
+        if (increments is None):
+            # Brownian bridge, one date back
+            brownian *= time_k/time_next
+            brownian += correlated(rng.standard_normal((half, nr_assets)))*np.sqrt(time_k*delta_t/time_next)
+        else:
+            # Last increment removed
+            brownian -= correlated(increments[:, k].T)*np.sqrt(delta_t)
+        np.exp(drift*time_k + annual_vols*brownian, out=prices)
+        prices *= s0
+
+        # Cash flows valued at this date
+        cash_flows *= step_discount
+
+        exercise = exercise_payoff(prices)
+        in_the_money = (exercise > 0)
+        if not np.any(in_the_money):
+            continue
+
+        basis = _lsm_basis(prices[in_the_money], s0, exercise[in_the_money], degree)
+        if (basis.shape[0] <= basis.shape[1]):
+            # Too few paths in the money for the regression
+            continue
+
+        # Normal equations: one product with the (paths x regressors) basis, then a small solve
+        coefs = np.linalg.lstsq(basis.T @ basis, basis.T @ cash_flows[in_the_money], rcond=None)[0]
+        continuation = basis @ coefs
+
+        exercised = np.flatnonzero(in_the_money)[exercise[in_the_money] > continuation]
+        cash_flows[exercised] = exercise[exercised]
+
+    cash_flows *= step_discount
+    samples = cash_flows.reshape(nr_legs, half).mean(axis=0)
+    price = samples.mean()
+
+    # Immediate exercise
+    price = max(price, float(exercise_payoff(s0[None, :])[0]))
+
+    return MCResult(float(price), float(samples.std(ddof=1)/np.sqrt(half)), nr_legs*half)
@@ -0,0 +1,287 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Correlated multi-asset Monte Carlo engine, and the Basket / Worst-Of / Best-Of options priced on it
+"""
+
+from enum import Enum
+from functools import partial
+
+import numpy as np
+
+from monte_carlo import run_chunked, run_parallel, longstaff_schwartz, MCResult, MC_CHUNK_SIZE, LSM_PATHS
+from monte_carlo import LSM_DATES_PER_YEAR
+from options import OptionType, OptionStyle
+from sampling import NormalSource
+
+
+class BasketType(Enum):
+    Basket = 1      # Weighted average of the performances
+    WorstOf = 2     # Worst performance
+    BestOf = 3      # Best performance
+
+
+class MultiAssetGBM:
+    """
+    MultiAssetGBM
+
+    == Summary ==
+    Correlated Geometric Brownian Motions of several underlyings. The Cholesky factor of the
+    correlation matrix is computed once, when the model is built, and reused by every simulation:
+    the correlated normals of a whole chunk of paths are one matrix product (paths x assets)
+
+    == Attributes ==
+    s0 (np.ndarray):            Current value of each underlying
+    annual_vols (np.ndarray):   Annual volatility of each underlying
+    div_yields (np.ndarray):    Annual dividend yield of each underlying
+    correlation (np.ndarray):   Correlation matrix (assets x assets)
+    free_rate (float):          Annual risk-free rate
+    cholesky (np.ndarray):      Lower triangular Cholesky factor of the correlation matrix
+    """
+
+    def __init__(self, s0, annual_vols, div_yields, correlation, free_rate: float):
+
+        self.s0, self.annual_vols, self.div_yields = (np.asarray(x, dtype=float) for x in
+            np.broadcast_arrays(s0, annual_vols, div_yields))
+        self.correlation = np.asarray(correlation, dtype=float)
+        self.free_rate = free_rate
+
+        if (self.correlation.shape != (self.nr_assets, self.nr_assets)):
+            raise ValueError("MultiAssetGBM: Correlation matrix must be assets x assets")
+        if not np.allclose(self.correlation, self.correlation.T) or np.any(np.diag(self.correlation) != 1):
+            raise ValueError("MultiAssetGBM: Correlation matrix must be symmetric, with a unit diagonal")
+        if np.any(self.annual_vols < 0):
+            raise ValueError("MultiAssetGBM: Annual Volatility cant be negative")
+
+        try:
+            self.cholesky = np.linalg.cholesky(self.correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError("MultiAssetGBM: Correlation matrix must be positive definite")
+
+
+    @property
+    def nr_assets(self) -> int:
+
+        return self.s0.size
+
+
+    def correlated_normals(self, nr_paths: int, rng: np.random.Generator, 
+        normal_source: NormalSource = None) -> np.ndarray:
+        """
+        Correlated standard normals (paths x assets), from one matrix product with the Cholesky factor
+        (independent normals from normal_source, one dimension per asset, if there is one)
+        """
+
+        normals = rng.standard_normal((nr_paths, self.nr_assets)) if (normal_source is None) else \
+            normal_source.normals(self.nr_assets, nr_paths).T
+
+        return normals @ self.cholesky.T
+
+
+    def terminal_prices(self, maturity: float, normals: np.ndarray) -> np.ndarray:
+        """
+        Prices of the underlyings at maturity (paths x assets), exact lognormal step from the correlated
+        normals, computed in place
+        """
+
+        normals *= self.annual_vols*np.sqrt(maturity)
+        normals += (self.free_rate - self.div_yields - (self.annual_vols**2)/2)*maturity
+        np.exp(normals, out=normals)
+        normals *= self.s0
+
+        return normals
+
+
+def multi_asset_payoff(prices: np.ndarray, s0: np.ndarray, basket_type: BasketType, strike: float,
+    weights: np.ndarray = None, call: bool = True) -> np.ndarray:
+    """
+    multi_asset_payoff
+
+    == Summary ==
+    Payoff of an option on the performances of several underlyings (S_T/s0), without any Python loop:
+    - Basket:   max(sum(w*S_T/s0) - X, 0)
+    - WorstOf:  max(min(S_T/s0) - X, 0)
+    - BestOf:   max(max(S_T/s0) - X, 0)
+    (Puts: X - performance), per unit of notional
+
+    == Args ==
+    prices (np.ndarray):        Prices of the underlyings (paths x assets), overwritten
+    s0 (np.ndarray):            Initial value of each underlying
+    basket_type (BasketType):   Basket, Worst-Of or Best-Of
+    strike (float):             Strike, as a performance (1.0 is at the money)
+    weights (np.ndarray):       Weights of the basket (equal if None)
+    call (bool):                True for Call options, False for Put options
+
+    == Returns ==
+    (np.ndarray) Payoff of each path
+    """
+
+    performances = np.divide(prices, s0, out=prices)
+
+    if (basket_type is BasketType.Basket):
+        weights = np.full(s0.size, 1/s0.size) if (weights is None) else np.asarray(weights, dtype=float)
+        level = performances @ weights
+    elif (basket_type is BasketType.WorstOf):
+        level = performances.min(axis=1)
+    else:
+        level = performances.max(axis=1)
+
+    return np.maximum(level - strike, 0) if call else np.maximum(strike - level, 0)
+
+
+def multi_asset_exercise(prices: np.ndarray, s0: np.ndarray, basket_type: BasketType, strike: float,
+    weights=None, call: bool = True, notional: float = 1.0) -> np.ndarray:
+    """
+    Exercise value of the option on each path (for longstaff_schwartz), the prices being kept
+    """
+
+    return notional*multi_asset_payoff(prices.copy(), s0, basket_type, strike, weights, call)
+
+
+def _multi_asset_samples(nr_paths: int, rng: np.random.Generator, model: MultiAssetGBM, maturity: float,
+    basket_type: BasketType, strike: float, weights, call: bool, notional: float, antithetic: bool,
+    control_variates: bool, normal_source: NormalSource = None) -> np.ndarray:
+    """
+    Samples of mc_multi_asset (legs x paths x columns): discounted payoff, and the discounted
+    equally weighted performance of the underlyings as control
+    """
+
+    nr_legs = 2 if antithetic else 1
+    discount = notional*np.exp(-model.free_rate*maturity)
+
+    normals = model.correlated_normals(-(-nr_paths//nr_legs), rng, normal_source)
+    normals = np.concatenate((normals, -normals)) if antithetic else normals
+    prices = model.terminal_prices(maturity, normals)
+
+    samples = np.empty((prices.shape[0], 2 if control_variates else 1))
+    if control_variates:
+        samples[:, 1] = (prices/model.s0).mean(axis=1)
+    samples[:, 0] = multi_asset_payoff(prices, model.s0, basket_type, strike, weights, call)
+    samples *= discount
+
+    return samples.reshape(nr_legs, -1, samples.shape[1])
+
+
+def mc_multi_asset(model: MultiAssetGBM, maturity: float, basket_type: BasketType, strike: float,
+    weights=None, call: bool = True, notional: float = 1.0, target_error: float = None,
+    time_budget: float = None, max_paths: int = 1_000_000, chunk_size: int = MC_CHUNK_SIZE,
+    rng: np.random.Generator = None, antithetic: bool = False, control_variates: bool = True,
+    nr_workers: int = 1, seed=None, normal_source: NormalSource = None) -> MCResult:
+    """
+    mc_multi_asset
+
+    == Summary ==
+    Computes the Price of an EU option on several correlated underlyings by Monte Carlo (see
+    multi_asset_payoff). Only the terminal prices of each chunk are simulated (exact lognormal step),
+    never the path histories: memory is O(chunk_size x assets). The equally weighted performance of the
+    underlyings, whose expected discounted value is known (mean of e^(-q*T)), is the control variate
+
+    == Args ==
+    model (MultiAssetGBM):      Correlated underlyings
+    maturity (float):           Number of years until maturity
+    basket_type (BasketType):   Basket, Worst-Of or Best-Of
+    strike (float):             Strike, as a performance (1.0 is at the money)
+    weights (array):            Weights of the basket (equal if None)
+    call (bool):                True for Call options, False for Put options
+    notional (float):           Notional of the option
+    target_error (float):       Standard error to reach (None to ignore)
+    time_budget (float):        Wall-clock budget, in seconds (None to ignore)
+    max_paths (int):            Maximum number of paths
+    chunk_size (int):           Number of paths per chunk
+    rng (Generator):            Random number generator (a new one if None)
+    antithetic (bool):          Whether the paths come in antithetic pairs
+    control_variates (bool):    Whether the control variate is used
+    nr_workers (int):           Number of processes (see run_parallel)
+    seed (int):                 Seed of run_parallel
+    normal_source (NormalSource): Source of the normals (None: rng, or the streams of run_parallel),
+                                always consumed by run_chunked
+
+    == Returns ==
+    (MCResult) Price, standard error and number of paths used
+    """
+
+    sampler = partial(_multi_asset_samples, model=model, maturity=maturity, basket_type=basket_type,
+        strike=strike, weights=weights, call=call, notional=notional, antithetic=antithetic,
+        control_variates=control_variates, normal_source=normal_source)
+    control_means = [notional*np.exp(-model.div_yields*maturity).mean()] if control_variates else None
+
+    if (normal_source is None) and ((nr_workers != 1) or (seed is not None)):
+        return run_parallel(sampler, target_error, time_budget, max_paths, seed, nr_workers,
+            chunk_size=chunk_size, control_means=control_means)
+
+    return run_chunked(sampler, target_error, time_budget, max_paths, chunk_size, rng, control_means)
+
+
+class MultiAssetOption:
+    """
+    MultiAssetOption
+
+    == Summary ==
+    Class that represents an EU Basket, Worst-Of or Best-Of Option on several correlated underlyings,
+    priced by Monte Carlo (see mc_multi_asset), or by Longstaff-Schwartz if it is a US option
+
+    == Attributes ==
+    model (MultiAssetGBM)       Correlated underlyings (s0, volatilities, dividends, correlation, rate)
+    strike (float)              Strike, as a performance of the underlyings (1.0 is at the money)
+    maturity (float)            Years to Maturity
+    basket_type (BasketType)    Basket, Worst-Of or Best-Of
+    weights (list)              Weights of the basket (None for equal weights)
+    option_type (OptionType)    Option Type (Call/Put)
+    option_style (OptionStyle)  Option Style (US/EU)
+    notional (float)            Notional
+    target_error (float)        Standard error the Monte Carlo price stops at
+    max_sims (int)              Maximum number of Monte Carlo simulations
+    antithetic (bool)           Monte Carlo with antithetic pairs of paths
+    seed (int)                  Seed of the Monte Carlo price (None: random)
+    normal_source (NormalSource) Source of the normals of the Monte Carlo price (None: pseudo-random, 
+                                from seed), restarted on every price
+    """
+
+    def __init__(self, model: MultiAssetGBM):
+
+        self.model:         MultiAssetGBM   = model
+        self.strike:        float           = 1.0
+        self.maturity:      float           = 1.0
+        self.basket_type:   BasketType      = BasketType.WorstOf
+        self.weights:       list            = None
+        self.option_type:   OptionType      = OptionType.Call
+        self.option_style:  OptionStyle     = OptionStyle.EU
+        self.notional:      float           = 100
+        self.target_error:  float           = 0.01
+        self.max_sims:      int             = 1_000_000
+        self.antithetic:    bool            = True
+        self.seed:          int             = None
+        self.normal_source: NormalSource    = None
+
+
+    def price_mc_result(self, rng: np.random.Generator = None) -> MCResult:
+        """
+        Monte Carlo price (Longstaff-Schwartz, with LSM_DATES_PER_YEAR exercise dates per year, if it is 
+        a US option), with its standard error
+        """
+
+        if (self.normal_source is not None):
+            self.normal_source.reset()
+
+        if (self.option_style is OptionStyle.US):
+            exercise = partial(multi_asset_exercise, s0=self.model.s0, basket_type=self.basket_type, 
+                strike=self.strike, weights=self.weights, call=(self.option_type is OptionType.Call), 
+                notional=self.notional)
+            rng = np.random.default_rng(self.seed) if (rng is None) else rng
+
+            return longstaff_schwartz(exercise, self.model.s0, self.model.annual_vols, self.model.div_yields,
+                self.model.free_rate, self.maturity, max(1, int(round(self.maturity*LSM_DATES_PER_YEAR))), 
+                LSM_PATHS, rng, self.model.cholesky, normal_source=self.normal_source)
+
+        return mc_multi_asset(self.model, self.maturity, self.basket_type, self.strike, self.weights,
+            self.option_type is OptionType.Call, self.notional, self.target_error, None, self.max_sims,
+            rng=rng, antithetic=self.antithetic, seed=self.seed, normal_source=self.normal_source)
+
+
+    def price(self) -> float:
+        """
+        Monte Carlo price of the option
+        """
+
+        return self.price_mc_result().price
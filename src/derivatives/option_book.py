@@ -0,0 +1,338 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Definition of the Option Book: a whole portfolio of contracts stored column-wise, priced in batches
+"""
+
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+
+from option_pricing import black_scholes_batch, bjerksund_stensland, bjerksund_stensland_greeks
+from option_pricing import binomial_us_batch, binomial_us_batch_greeks, price_greeks, PriceGreeks
+from options import Option, VanillaOption, AssetOrNothinOption, OptionType, OptionStyle, USPricing
+
+
+class ProductKind(Enum):
+    Vanilla = 1
+    AssetOrNothing = 2
+
+
+class OptionBook:
+    """
+    OptionBook
+
+    == Summary ==
+    Book of EU/US Vanilla and EU Asset-Or-Nothing options, stored as a struct of arrays: one NumPy
+    column per field, one row per contract. Rows are appended into preallocated columns whose
+    capacity doubles when full (amortized O(1) appends), and the book is priced by splitting it
+    into homogeneous slices (EU, US of each pricing model), each one priced by a single call of the
+    vectorized pricers of option_pricing, so no contract goes through an Option object
+
+    == Attributes ==
+    s0 (np.ndarray)             Current value of the underlying
+    strike (np.ndarray)         Strike price
+    maturity (np.ndarray)       Years to maturity
+    vol (np.ndarray)            Annual volatility
+    rate (np.ndarray)           Annual risk-free rate
+    div (np.ndarray)            Annual dividend yield
+    option_type (np.ndarray)    Option Type (OptionType value)
+    option_style (np.ndarray)   Option Style (OptionStyle value)
+    kind (np.ndarray)           Product Kind (ProductKind value)
+    us_pricing (np.ndarray)     Pricing model of the US options (USPricing value). Rows default to the
+                                Analytic approximation (O(1) per contract), the Binomial Model is opt-in
+                                (O(steps^2) per contract, stepped back in chunks of BINOMIAL_CHUNK_ROWS
+                                trees); add_option records the model of the option
+    """
+
+    FLOAT_COLUMNS = ("s0", "strike", "maturity", "vol", "rate", "div")
+    CODE_COLUMNS = ("option_type", "option_style", "kind", "us_pricing")
+
+    def __init__(self, capacity: int = 1024):
+
+        self._size = 0
+        self._columns = {name: np.empty(capacity) for name in OptionBook.FLOAT_COLUMNS}
+        self._columns.update({name: np.empty(capacity, dtype=np.int8) for name in OptionBook.CODE_COLUMNS})
+
+
+    @classmethod
+    def from_arrays(cls, s0, strike, maturity, vol, rate, div, option_type=OptionType.Call,
+        option_style=OptionStyle.EU, kind=ProductKind.Vanilla, us_pricing=USPricing.Analytic):
+        """
+        Book holding the given contracts (see extend)
+        """
+
+        book = cls(capacity=0)
+        book.extend(s0, strike, maturity, vol, rate, div, option_type, option_style, kind, us_pricing)
+
+        return book
+
+
+    @classmethod
+    def from_options(cls, options):
+        """
+        Book holding the given VanillaOption / AssetOrNothinOption objects (see add_option)
+        """
+
+        book = cls()
+        for option in options:
+            book.add_option(option)
+
+        return book
+
+
+    def __len__(self) -> int:
+
+        return self._size
+
+
+    def __getattr__(self, name: str) -> np.ndarray:
+
+        # Columns are read as views of their filled rows
+        columns = self.__dict__.get("_columns", {})
+        if name in columns:
+            return columns[name][:self._size]
+
+        raise AttributeError(f"'OptionBook' object has no attribute '{name}'")
+
+
+    @property
+    def is_call(self) -> np.ndarray:
+
+        return self.option_type == OptionType.Call.value
+
+
+    def _reserve(self, nr_rows: int):
+        """
+        Makes room for nr_rows more rows, doubling the capacity of the columns if needed
+        """
+
+        needed = self._size + nr_rows
+        capacity = self._columns["s0"].size
+
+        if (needed > capacity):
+            capacity = max(needed, 2*capacity)
+            for name, column in self._columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._columns[name] = grown
+
+
+    def append(self, s0: float, strike: float, maturity: float, vol: float, rate: float, div: float,
+        option_type: OptionType = OptionType.Call, option_style: OptionStyle = OptionStyle.EU,
+        kind: ProductKind = ProductKind.Vanilla, us_pricing: USPricing = USPricing.Analytic):
+        """
+        Adds one contract to the book (maturity in years)
+        """
+
+        self._reserve(1)
+        row = self._size
+
+        for name, value in zip(OptionBook.FLOAT_COLUMNS, (s0, strike, maturity, vol, rate, div)):
+            self._columns[name][row] = value
+        for name, value in zip(OptionBook.CODE_COLUMNS, (option_type, option_style, kind, us_pricing)):
+            self._columns[name][row] = value.value
+
+        self._size += 1
+
+
+    def extend(self, s0, strike, maturity, vol, rate, div, option_type=OptionType.Call,
+        option_style=OptionStyle.EU, kind=ProductKind.Vanilla, us_pricing=USPricing.Analytic):
+        """
+        extend
+
+        == Summary ==
+        Adds a batch of contracts to the book. The fields can be scalars or arrays (broadcast
+        against each other), the categories an enum member (same for the whole batch) or an
+        array of enum values
+        """
+
+        codes = [np.asarray(x.value if isinstance(x, Enum) else x, dtype=np.int8)
+            for x in (option_type, option_style, kind, us_pricing)]
+        values = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (s0, strike, maturity, vol,
+            rate, div)), *codes)
+        nr_rows = values[0].size
+
+        self._reserve(nr_rows)
+        for name, value in zip(OptionBook.FLOAT_COLUMNS + OptionBook.CODE_COLUMNS, values):
+            self._columns[name][self._size:self._size + nr_rows] = np.ravel(value)
+
+        self._size += nr_rows
+
+
+    def add_option(self, option: Option, **fields):
+        """
+        Adds a VanillaOption or an AssetOrNothinOption to the book (read with its volatility surface,
+        if it has one, and with its own US pricing model). fields are the extra fields of the row,
+        passed on to append
+        """
+
+        if not isinstance(option, (VanillaOption, AssetOrNothinOption)):
+            raise ValueError("OptionBook: Only Vanilla and Asset-Or-Nothing options can be added to a book")
+
+        maturity = option.get_years_to_maturity()
+
+        if isinstance(option, VanillaOption):
+            style, kind, us_pricing = option.option_style, ProductKind.Vanilla, option.us_pricing
+        else:
+            style, kind, us_pricing = OptionStyle.EU, ProductKind.AssetOrNothing, USPricing.Analytic
+
+        self.append(option.s0, option.strike, maturity, option.get_annual_vol(maturity), option.free_rate,
+            option.div_yield, option.option_type, style, kind, us_pricing, **fields)
+
+
+    def filter(self, rows) -> "OptionBook":
+        """
+        New book with the selected rows (boolean mask or indices)
+        """
+
+        book = self.__class__(capacity=0)
+        book._columns = {name: column[:self._size][rows] for name, column in self._columns.items()}
+        book._size = book._columns["s0"].size
+
+        return book
+
+
+    def group_by_maturity(self) -> dict:
+        """
+        group_by_maturity
+
+        == Summary ==
+        Splits the book by maturity, with one stable sort of the maturity column
+
+        == Returns ==
+        (dict) Book of each maturity, by increasing maturity
+        """
+
+        order = np.argsort(self.maturity, kind="stable")
+        maturities, starts = np.unique(self.maturity[order], return_index=True)
+
+        return {maturity: self.filter(rows) for maturity, rows in zip(maturities, np.split(order, starts[1:]))}
+
+
+    def _slices(self, us_pricing: USPricing = None):
+        """
+        Homogeneous slices of the book: the EU rows, and the US rows of each pricing model (the one
+        of each row, or us_pricing for all of them). A slice is the full book if it is homogeneous
+        (no copy of the columns), indices otherwise
+
+        == Returns ==
+        (generator) Pricing model of each slice (None for EU) and its rows
+        """
+
+        if (self._size == 0):
+            return
+
+        is_us = (self.option_style == OptionStyle.US.value)
+        models = self.us_pricing if (us_pricing is None) else np.int8(us_pricing.value)
+        groups = np.where(is_us, models, 0)
+        codes = np.unique(groups)
+
+        for code in codes:
+            rows = slice(None) if (codes.size == 1) else np.flatnonzero(groups == code)
+            yield (USPricing(code) if code else None), rows
+
+
+    def _us_inputs(self, rows, us_pricing: USPricing) -> tuple:
+        """
+        Inputs of the US pricers for the given rows (US options are always Vanillas)
+        """
+
+        if np.any(self.kind[rows] != ProductKind.Vanilla.value):
+            raise ValueError("OptionBook: US Asset-Or-Nothing options are not supported")
+        if (us_pricing is USPricing.MonteCarlo):
+            raise ValueError("OptionBook: US options are priced with the Binomial Model or the Analytic approximation")
+
+        return (self.s0[rows], self.strike[rows], self.maturity[rows], self.vol[rows], self.rate[rows],
+            self.div[rows], self.is_call[rows])
+
+
+    def price(self, us_pricing: USPricing = None) -> np.ndarray:
+        """
+        price
+
+        == Summary ==
+        Price of every contract of the book. EU Vanillas are priced with black_scholes_batch, EU
+        Asset-Or-Nothings with the fused Black-Scholes kernel, US options with one batched call
+        of the Bjerksund-Stensland approximation or of the Binomial Model (per pricing model)
+
+        == Args ==
+        us_pricing (USPricing):     Pricing model of all the US options (Analytic or Binomial), None
+                                    for the one of each contract
+
+        == Returns ==
+        (np.ndarray) Price of each contract, in the order of the book
+        """
+
+        prices = np.empty(self._size)
+
+        for model, rows in self._slices(us_pricing):
+
+            if (model is not None):
+                pricer = bjerksund_stensland if (model is USPricing.Analytic) else binomial_us_batch
+                s0, strike, maturity, vol, rate, div, call = self._us_inputs(rows, model)
+                prices[rows] = pricer(s0, strike, maturity, vol, rate, div, call=call)
+                continue
+
+            vanilla = (self.kind[rows] == ProductKind.Vanilla.value)
+            inputs = (self.s0[rows], self.strike[rows], self.vol[rows], self.maturity[rows], self.rate[rows],
+                self.div[rows])
+
+            if np.all(vanilla):
+                prices[rows] = black_scholes_batch(*inputs, call=self.is_call[rows])
+            else:
+                prices[rows] = price_greeks(*inputs, vanilla=vanilla, call=self.is_call[rows]).price
+
+        return prices
+
+
+    def price_greeks(self, us_pricing: USPricing = None) -> PriceGreeks:
+        """
+        price_greeks
+
+        == Summary ==
+        Price and greeks of every contract of the book: one call of the fused Black-Scholes kernel
+        for the EU options, one batched call of bjerksund_stensland_greeks or binomial_us_batch_greeks
+        for the US ones (per pricing model)
+
+        == Args ==
+        us_pricing (USPricing):     Pricing model of all the US options (Analytic or Binomial), None
+                                    for the one of each contract
+
+        == Returns ==
+        (PriceGreeks) Price, Delta, Gamma, Vega, Rho and Theta of each contract (arrays, in the order
+        of the book)
+        """
+
+        results = PriceGreeks(*(np.empty(self._size) for _ in PriceGreeks._fields))
+
+        for model, rows in self._slices(us_pricing):
+
+            if (model is not None):
+                pricer = bjerksund_stensland_greeks if (model is USPricing.Analytic) else \
+                    binomial_us_batch_greeks
+                s0, strike, maturity, vol, rate, div, call = self._us_inputs(rows, model)
+                slice_results = pricer(s0, strike, maturity, vol, rate, div, call=call)
+            else:
+                slice_results = price_greeks(self.s0[rows], self.strike[rows], self.vol[rows],
+                    self.maturity[rows], self.rate[rows], self.div[rows],
+                    vanilla=(self.kind[rows] == ProductKind.Vanilla.value), call=self.is_call[rows])
+
+            for column, values in zip(results, slice_results):
+                column[rows] = values
+
+        return results
+
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Df of the book (one row per contract), with the categories as names
+        """
+
+        df = pd.DataFrame({name: getattr(self, name) for name in OptionBook.FLOAT_COLUMNS})
+        for name, enum in zip(OptionBook.CODE_COLUMNS, (OptionType, OptionStyle, ProductKind, USPricing)):
+            df[name] = pd.Categorical.from_codes(getattr(self, name) - 1, [member.name for member in enum])
+
+        return df
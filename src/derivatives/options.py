@@ -6,9 +6,15 @@ Definition of Option class
 """
 
 from option_pricing import *
+from monte_carlo import mc_asset_or_nothing_chunked, mc_asset_or_nothing_greeks, MCResult, MCGreeks
+from monte_carlo import mc_path_dependent, PathPayoff, AsianPayoff, BarrierPayoff, LookbackPayoff
+from monte_carlo import longstaff_schwartz, vanilla_exercise, LSM_DATES_PER_YEAR
+from functools import partial
+from vol_surface import VolSurface
+from sampling import NormalSource
 from enum import Enum
+from typing import NamedTuple
 
-import pandas as pd
 import numpy as np
 
 class Period(Enum):
@@ -23,6 +29,65 @@ class OptionStyle(Enum):
     EU = 1
     US = 2 
     
+class USPricing(Enum):
+    Binomial = 1    # Binomial Model (lattice)
+    Analytic = 2    # Bjerksund-Stensland approximation
+    MonteCarlo = 3  # Longstaff-Schwartz (Least-Squares Monte Carlo)
+    
+class PricingMethod(Enum):
+    ClosedForm = 1
+    MonteCarlo = 2
+    
+class AverageType(Enum):
+    Arithmetic = 1
+    Geometric = 2
+    
+class BarrierDirection(Enum):
+    Up = 1
+    Down = 2
+    
+class BarrierKnock(Enum):
+    In = 1      # Option only pays if the barrier was reached
+    Out = 2     # Option is cancelled if the barrier was reached
+    
+
+class Contract(NamedTuple):
+    """
+    Contract
+    
+    == Summary ==
+    Terms of an option contract, as a compact immutable record (a tuple: no per-instance dict). 
+    Equal terms give equal (and equally hashed) contracts, so a Contract can be used as a cache key, 
+    and copying an option only copies a reference to it
+    """
+    s0:             float       = 100
+    strike:         float       = 100
+    period_size:    Period      = Period.Years
+    maturity:       float       = 3
+    annual_vol:     float       = 0.1
+    free_rate:      float       = 0.03
+    div_yield:      float       = 0.01
+    option_type:    OptionType  = OptionType.Call
+    option_style:   OptionStyle = OptionStyle.EU
+
+
+# Contracts are immutable: new options share the default one until a field is set
+DEFAULT_CONTRACT = Contract()
+    
+    
+def _contract_field(name: str) -> property:
+    """
+    Attribute of an Option stored in its Contract (setting it replaces the contract)
+    """
+    
+    def getter(self):
+        return getattr(self._contract, name)
+    
+    def setter(self, value):
+        self._contract = self._contract._replace(**{name: value})
+    
+    return property(getter, setter, doc=f"{name} of the contract")
+    
 
 class Option:
     """
@@ -30,6 +95,8 @@ class Option:
     
     == Summary ==
     Class that represents a Vanilla Option
+    The terms of the contract are kept in a Contract record (see contract), and the instance 
+    itself is slotted
     
     == Attributes ==
     s0 (float):                 Current value of the underlying
@@ -40,21 +107,34 @@ class Option:
     free_rate (float)           Annual risk-free rate (0 < free_rate < 1)
     div_yield (float)           Annual dividend yield (0 < div_yield < 1)
     option_type (OptionType)    Option Type (Call/Put)
+    vol_surface (VolSurface)    Implied Volatility Surface to price off (None to use annual_vol)
     """
     
+    __slots__ = ("_contract", "vol_surface")
+    
+    s0          = _contract_field("s0")
+    strike      = _contract_field("strike")
+    period_size = _contract_field("period_size")
+    maturity    = _contract_field("maturity")
+    annual_vol  = _contract_field("annual_vol")
+    free_rate   = _contract_field("free_rate")
+    div_yield   = _contract_field("div_yield")
+    option_type = _contract_field("option_type")
+    
     
     def __init__(self):
         
         # Every new instance of an option will be init with values for all its attributes
 
-        self.s0:            float       = 100
-        self.strike:        float       = 100
-        self.period_size:   Period      = Period.Years
-        self.maturity:      int         = 3
-        self.annual_vol:    float       = 0.1
-        self.free_rate:     float       = 0.03
-        self.div_yield:     float       = 0.01
-        self.option_type:   OptionType  = OptionType.Call
+        self._contract:     Contract    = DEFAULT_CONTRACT
+        self.vol_surface:   VolSurface  = None
+        
+    @property
+    def contract(self) -> Contract:
+        """
+        Terms of the contract (hashable, usable as a cache key)
+        """
+        return self._contract
         
         
     def is_call(self):
@@ -127,6 +207,19 @@ class Option:
         return self.maturity if (self.period_size is Period.Years) else round(self.maturity*(1/12),2)
     
     
+    def get_annual_vol(self, maturity_years: float = None) -> float:
+        """
+        Annual Volatility used for pricing: read from the Volatility Surface at the option 
+        strike and maturity (for the current s0) if there is one, annual_vol otherwise
+        """
+        
+        if self.vol_surface is None:
+            return self.annual_vol
+        
+        maturity_years = self.get_years_to_maturity() if (maturity_years is None) else maturity_years
+        
+        return self.vol_surface.vol(self.strike, maturity_years, s0=self.s0)
+    
     def get_option_type(self) -> str:
         
         return "Call" if (self.option_type is OptionType.Call) else "Put"
@@ -156,6 +249,9 @@ class Option:
     
     def rho(self) -> float:
         raise NotImplementedError("Not Implemented Error")
+    
+    def price_greeks(self) -> PriceGreeks:
+        raise NotImplementedError("Not Implemented Error")
         
             
             
@@ -193,15 +289,21 @@ class VanillaOption(Option):
     div_yield (float)           Annual dividend yield (0 < div_yield < 1)
     option_type (OptionType)    Option Type (Call/Put)
     option_style OptionStyle)   Option Style (US/EU)
+    us_pricing (USPricing)      Pricing model of US options (Binomial Model, Analytic approximation or Monte Carlo,
+                                whose price_greeks are the Binomial Model ones)
     """
     
+    __slots__ = ("us_pricing",)
+    
+    option_style = _contract_field("option_style")
+    
     
     def __init__(self):
         
         # Every new instance of an option will be init with values for all its attributes
 
         super().__init__()
-        self.option_style:  OptionStyle = OptionStyle.EU
+        self.us_pricing:    USPricing   = USPricing.Binomial
         
     def get_option_style(self) -> str:
         
@@ -214,45 +316,89 @@ class VanillaOption(Option):
         
         == Summary ==
         Returns the price of the option (int), using Black-Scholes if it is an EU option, 
-        Binomial Model, otherwise
+        Binomial Model (or the Bjerksund-Stensland approximation, or Longstaff-Schwartz, see us_pricing), 
+        otherwise
         """
         
         # Amount of years until maturity (ex.: 1.5 -> 1 year and a half)
         maturity_years = self.maturity if (self.period_size is Period.Years) else self.maturity/12 
         # Whether the option is a Call (True) or a Put (False) 
         is_call = (self.option_type is OptionType.Call)
+        # Flat volatility, or read from the volatility surface
+        annual_vol = self.get_annual_vol(maturity_years)
         
         if (self.option_style is OptionStyle.EU):
             
             # If EU option, will use Black Scholes
-            return black_scholes(self.s0, self.strike, self.annual_vol, maturity_years, self.free_rate, 
+            return black_scholes(self.s0, self.strike, annual_vol, maturity_years, self.free_rate, 
                 self.div_yield, call=is_call)
             
+        elif (self.us_pricing is USPricing.Analytic):
+            
+            # If US option, with the fast analytic approximation
+            return bjerksund_stensland(self.s0, self.strike, maturity_years, annual_vol, self.free_rate,
+                self.div_yield, call=is_call)[()]
+            
+        elif (self.us_pricing is USPricing.MonteCarlo):
+            
+            # If US option, with Least-Squares Monte Carlo
+            return self.price_lsm(maturity_years, annual_vol)
+            
         else:
             
             # If US option, will use Binomial Model
-            return binomial_us(self.s0, self.strike, maturity_years, self.annual_vol, self.free_rate,
+            return binomial_us(self.s0, self.strike, maturity_years, annual_vol, self.free_rate,
                 self.div_yield, call=is_call)
             
-    def delta(self) -> float:
+    def price_greeks(self) -> PriceGreeks:
         """
-        Get Vanilla Option Delta
+        price_greeks
+        
+        == Summary ==
+        Returns the price and all the greeks of the option (PriceGreeks), computed in one pass:
+        the fused Black-Scholes kernel if it is an EU option, one Binomial Model tree (or one 
+        vectorized call of the Bjerksund-Stensland approximation, see us_pricing) otherwise.
+        
+        With USPricing.MonteCarlo the price and the greeks all come from the Binomial Model tree, as
+        bumped LSM revaluations (each one re-estimating the exercise policy) are too noisy for 
+        differences: the price is the centre the greeks were computed around, and can differ from 
+        the Least-Squares Monte Carlo price of price() by its Monte Carlo error
         """
         
         # Amount of years until maturity (ex.: 1.5 -> 1 year and a half)
-    
+        maturity_years = self.maturity if (self.period_size is Period.Years) else self.maturity/12
+        # Flat volatility, or read from the volatility surface
+        annual_vol = self.get_annual_vol(maturity_years)
         
         if (self.option_style is OptionStyle.EU):
             # EU
-            Tyears = self.get_years_to_maturity()
-            pheta = 1 if (self.option_type is OptionType.Call) else -1
-            d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-            
-            return pheta*np.exp(-self.div_yield*Tyears)*N(d1*pheta)
+            return price_greeks(self.s0, self.strike, annual_vol, maturity_years, self.free_rate, 
+                self.div_yield, vanilla=True, call=self.is_call())
+        elif (self.us_pricing is USPricing.Analytic):
+            # US, analytic approximation
+            return bjerksund_stensland_greeks(self.s0, self.strike, maturity_years, annual_vol, 
+                self.free_rate, self.div_yield, call=self.is_call())
+        
+        # US (also with Least-Squares Monte Carlo, see above)
+        return binomial_us_greeks(self.s0, self.strike, maturity_years, annual_vol, self.free_rate,
+            self.div_yield, call=self.is_call())
+    
+    def price_lsm(self, maturity_years: float, annual_vol: float) -> float:
+        """
+        Price of the US option by Least-Squares Monte Carlo (LSM_DATES_PER_YEAR exercise dates per year)
+        """
+        
+        nr_dates = max(1, int(round(maturity_years*LSM_DATES_PER_YEAR)))
+        
+        return longstaff_schwartz(partial(vanilla_exercise, strike=self.strike, call=self.is_call()), 
+            self.s0, annual_vol, self.div_yield, self.free_rate, maturity_years, nr_dates).price
             
-        else:
-            # US
-            raise NotImplementedError("Not Implemented Error")
+    def delta(self) -> float:
+        """
+        Get Vanilla Option Delta
+        """
+        
+        return self.price_greeks().delta
          
             
     def gamma(self) -> float:
@@ -260,39 +406,22 @@ class VanillaOption(Option):
         Get Vanilla Option Gamma
         """
         
-        if (self.option_style is OptionStyle.EU):
-            # EU
-            Tyears = self.get_years_to_maturity()
-            d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-            
-            return N_der(d1)*np.exp(-self.div_yield*Tyears)/(self.s0*self.annual_vol*np.sqrt(Tyears))
-        else:
-            # US
-            raise NotImplementedError("Not Implemented Error")
+        return self.price_greeks().gamma
         
     def vega(self) -> float:
-        if (self.option_style is OptionStyle.EU):
-            # EU
-            Tyears = self.get_years_to_maturity()
-            d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-            
-            return self.s0*np.exp(-self.div_yield*Tyears)*np.sqrt(Tyears)*N_der(d1)
-        else:
-            # US
-            raise NotImplementedError("Not Implemented Error")
+        """
+        Get Vanilla Option Vega
+        """
+        
+        return self.price_greeks().vega
         
         
     def rho(self) -> float:
-        if (self.option_style is OptionStyle.EU):
-            # EU
-            Tyears = self.get_years_to_maturity()
-            pheta = 1 if (self.option_type is OptionType.Call) else -1
-            d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-            
-            return pheta*self.strike*np.exp(-self.free_rate*Tyears)*Tyears*N(pheta*(d1-self.annual_vol*np.sqrt(Tyears)))
-        else:
-            # US
-            raise NotImplementedError("Not Implemented Error")
+        """
+        Get Vanilla Option Rho
+        """
+        
+        return self.price_greeks().rho
             
             
     def to_text(self):
@@ -307,15 +436,10 @@ class VanillaOption(Option):
         
         new_op = VanillaOption()
         
-        new_op.s0           = self.s0
-        new_op.strike       = self.strike
-        new_op.maturity     = self.maturity
-        new_op.annual_vol   = self.annual_vol
-        new_op.period_size  = self.period_size
-        new_op.free_rate    = self.free_rate
-        new_op.div_yield    = self.div_yield
-        new_op.option_style = self.option_style
-        new_op.option_type  = self.option_type
+        # The contract is immutable, it can be shared
+        new_op._contract    = self._contract
+        new_op.vol_surface  = self.vol_surface
+        new_op.us_pricing   = self.us_pricing
         
         return new_op
     
@@ -325,6 +449,20 @@ class AssetOrNothinOption(Option):
     - St if St >  X
     - 0  if St <= X
     
+    pricing_method (PricingMethod)  Closed Form (Black-Scholes) or Monte Carlo price
+    target_error (float)            Standard error the Monte Carlo price stops at
+    time_budget (float)             Wall-clock budget of the Monte Carlo price, in seconds (None for no limit)
+    max_sims (int)                  Maximum number of Monte Carlo simulations
+    antithetic (bool)               Monte Carlo with antithetic pairs of paths
+    control_variates (bool)         Monte Carlo with the underlying and the vanilla option as control variates
+    nr_workers (int)                Number of processes of the Monte Carlo price (1: no process pool)
+    seed (int)                      Seed of the Monte Carlo price, reproducible whatever nr_workers (None: random)
+    normal_source (NormalSource)    Source of the normals of the Monte Carlo price and greeks, e.g. Sobol (None: 
+                                    pseudo-random, from seed), restarted on every run. It is a single stream,
+                                    so nr_workers is then ignored
+
+    The Monte Carlo price streams its terminal prices chunk by chunk: no sample paths are generated
+    ahead or kept on the option, so there is nothing to cache or invalidate when an attribute changes
     """
     
     def __init__(self):
@@ -332,93 +470,384 @@ class AssetOrNothinOption(Option):
         # Every new instance of an option will be init with values for all its attributes
 
         super().__init__()
-        self.nr_sims = 10_000
-        # 1 period per 2d
-        self.delta_t = 1/183    
-        
-        Tyears = self.get_years_to_maturity()
-        self.sims_df = pd.DataFrame(np.random.standard_normal(size=(int(Tyears/self.delta_t + 1), self.nr_sims)))
+        self.pricing_method: PricingMethod = PricingMethod.ClosedForm
+        self.target_error = 0.05
+        self.time_budget = None
+        self.max_sims = 5_000_000
+        self.antithetic = True
+        self.control_variates = True
+        self.nr_workers = 1
+        self.seed = None
+        self.normal_source: NormalSource = None
         
-        # Paths used for pricing 
-        self.normal_path = self.generate_sample_path(self.s0)
-        # Paths used to compute the greeks
-        self.greek_path = self.generate_sample_path(self.s0*1.001)
+    
+    def price_mc_result(self, rng: np.random.Generator = None) -> MCResult:
+        """
+        Monte Carlo price of the AssetOrNothing Option, simulating the terminal prices only
+        (exact lognormal step, no paths), in chunks until target_error, time_budget or max_sims 
+        is reached (with the variance reduction techniques selected). Also returns the standard error, 
+        the number of simulations used and the variance reduction factors
+        """
         
-    def generate_sample_path(self, price):
+        if (self.normal_source is not None):
+            self.normal_source.reset()
         
-        "Df with all the simulated asse prices at maturity"
+        return mc_asset_or_nothing_chunked(self.s0, self.strike, self.get_years_to_maturity(), 
+            self.get_annual_vol(), self.free_rate, self.div_yield, self.is_call(), self.target_error, 
+            self.time_budget, self.max_sims, rng=rng, antithetic=self.antithetic, 
+            control_variates=self.control_variates, nr_workers=self.nr_workers, seed=self.seed, 
+            normal_source=self.normal_source)
     
-        sims_df_factor = (
-            (self.sims_df * self.annual_vol * np.sqrt(self.delta_t)) + (self.free_rate * self.delta_t) + 1)
-        sims_df_factor.iloc[0] = price
-        return sims_df_factor.cumprod()
+    
+    def price_mc(self, rng: np.random.Generator = None) -> float:
+        """
+        Monte Carlo price of the AssetOrNothing Option (see price_mc_result)
+        """
+        
+        return self.price_mc_result(rng).price
     
     
-    def price(self):
+    def greeks_mc_result(self, rng: np.random.Generator = None) -> MCGreeks:
         """
-        Price of the AssetOrNothing Option
+        Monte Carlo price and greeks of the AssetOrNothing Option, all from one simulation 
+        (pathwise + likelihood ratio estimators, see mc_asset_or_nothing_greeks, with the control 
+        variates selected), with their standard errors
         """
         
-        Tyears = self.get_years_to_maturity()
-        call = self.option_type is OptionType.Call
+        rng = np.random.default_rng(self.seed) if (rng is None) else rng
+        if (self.normal_source is not None):
+            self.normal_source.reset()
+        
+        return mc_asset_or_nothing_greeks(self.s0, self.strike, self.get_years_to_maturity(), 
+            self.get_annual_vol(), self.free_rate, self.div_yield, self.is_call(), self.target_error, 
+            self.time_budget, self.max_sims, rng=rng, antithetic=self.antithetic, 
+            control_variates=self.control_variates, normal_source=self.normal_source)
+    
+    
+    def price_greeks(self) -> PriceGreeks:
+        """
+        Price and all the greeks of the AssetOrNothing Option, computed in one pass
+        (Monte Carlo price and greeks of a single simulation if pricing_method is MonteCarlo)
+        """
         
-        # Adjust the underlying price for the dividend yield
-        s0_actual = self.s0 * np.exp(-self.div_yield * Tyears)
+        if (self.pricing_method is PricingMethod.MonteCarlo):
+            return self.greeks_mc_result().greeks
         
-        # Compute d1
-        d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
+        return price_greeks(self.s0, self.strike, self.get_annual_vol(), self.get_years_to_maturity(), 
+            self.free_rate, self.div_yield, vanilla=False, call=self.is_call())
+    
+    
+    def price(self):
+        """
+        Price of the AssetOrNothing Option
+        """
         
-        pheta = 1 if call else -1
+        if (self.pricing_method is PricingMethod.MonteCarlo):
+            return self.price_mc()
         
-        return s0_actual*N(pheta*d1)
+        return self.price_greeks().price
         
         
     def delta(self):
         """
         Delta
         """
-        Tyears = self.get_years_to_maturity()
-        pheta = 1 if (self.option_type is OptionType.Call) else -1
-        d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-        
-        return pheta*np.exp(-self.div_yield*Tyears)*N_der(d1)/(self.annual_vol*np.sqrt(Tyears)) +\
-            np.exp(-self.div_yield*Tyears)*N(pheta*d1)
         
+        return self.price_greeks().delta
         
         
     def gamma(self):
         """
         Gamma
         """
-        Tyears = self.get_years_to_maturity()
-        pheta = 1 if (self.option_type is OptionType.Call) else -1
-        d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-        d2 = d1 - (self.annual_vol*np.sqrt(Tyears))
         
-        return -pheta*np.exp(-self.div_yield*Tyears)/(self.s0*(self.annual_vol**2)*Tyears)*d2*N_der(d1)
+        return self.price_greeks().gamma
     
     
     def vega(self):
         """
         Vega
         """
-        Tyears = self.get_years_to_maturity()
-        pheta = 1 if (self.option_type is OptionType.Call) else -1
-        d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
-        d2 = d1 - (self.annual_vol*np.sqrt(Tyears))
         
-        return -(pheta*self.s0*np.exp(-self.div_yield*Tyears)/self.annual_vol)*(d2*N_der(d1))
+        return self.price_greeks().vega
     
     
     def rho(self):
         """
         Rho
         """
-        Tyears = self.get_years_to_maturity()
-        pheta = 1 if (self.option_type is OptionType.Call) else -1
-        d1 = (np.log(self.s0/self.strike) + Tyears*(self.free_rate - self.div_yield +(self.annual_vol**2)/2))/(self.annual_vol*(np.sqrt(Tyears))) 
         
-        return pheta*self.s0*np.exp(-self.div_yield*Tyears)*np.sqrt(Tyears)*N_der(d1)/self.annual_vol
+        return self.price_greeks().rho
+
+    
+    
+class PathDependentOption(Option):
+    """
+    PathDependentOption
+    
+    == Summary ==
+    Base class of the EU options whose payoff depends on the path of the underlying, observed on 
+    equally spaced dates. Priced by Monte Carlo, with the streaming path engine (see mc_path_dependent):
+    subclasses only define their payoff (PathPayoff)
+    
+    == Attributes ==
+    observations_per_year (int)     Number of observation dates per year
+    target_error (float)            Standard error the Monte Carlo price stops at
+    time_budget (float)             Wall-clock budget of the Monte Carlo price, in seconds (None for no limit)
+    max_sims (int)                  Maximum number of Monte Carlo simulations
+    antithetic (bool)               Monte Carlo with antithetic pairs of paths
+    control_variates (bool)         Monte Carlo with the control variates of the payoff
+    nr_workers (int)                Number of processes of the Monte Carlo price (1: no process pool)
+    seed (int)                      Seed of the Monte Carlo price (None: random)
+    normal_source (NormalSource)    Source of the normals of the Monte Carlo price, e.g. Sobol (None: 
+                                    pseudo-random, from seed), restarted on every run. It is a single stream,
+                                    so nr_workers is then ignored
+    """
+    
+    # Relative bump of s0 (central differences), and maturity bump (years), of the greeks
+    S0_BUMP = 0.01
+    THETA_BUMP = 1/365
+    
+    def __init__(self):
+        
+        # Every new instance of an option will be init with values for all its attributes
+
+        super().__init__()
+        self.observations_per_year = 52
+        self.target_error = 0.01
+        self.time_budget = None
+        self.max_sims = 1_000_000
+        self.antithetic = True
+        self.control_variates = True
+        self.nr_workers = 1
+        self.seed = None
+        self.normal_source: NormalSource = None
+        
+    def get_nr_steps(self) -> int:
+        """
+        Number of observation dates until maturity (at least 1)
+        """
+        
+        return max(1, int(round(self.get_years_to_maturity()*self.observations_per_year)))
+    
+    def payoff(self) -> PathPayoff:
+        raise NotImplementedError("Not Implemented Error")
+    
+    
+    def price_mc_result(self, rng: np.random.Generator = None, s0: float = None, maturity: float = None,
+        annual_vol: float = None, free_rate: float = None, nr_steps: int = None, seed=None, 
+        max_sims: int = None) -> MCResult:
+        """
+        Monte Carlo price, standard error, number of simulations and variance reduction factors.
+        Any of the market parameters can be overridden (revaluations of the greeks)
+        """
+        
+        maturity = self.get_years_to_maturity() if (maturity is None) else maturity
+        annual_vol = self.get_annual_vol(maturity) if (annual_vol is None) else annual_vol
+        # Fixed number of paths when revaluing
+        target_error = self.target_error if (max_sims is None) else None
+        if (self.normal_source is not None):
+            self.normal_source.reset()
+        
+        return mc_path_dependent(self.payoff(), self.s0 if (s0 is None) else s0, maturity, annual_vol, 
+            self.free_rate if (free_rate is None) else free_rate, self.div_yield, 
+            self.get_nr_steps() if (nr_steps is None) else nr_steps, target_error, self.time_budget, 
+            self.max_sims if (max_sims is None) else max_sims, rng=rng, antithetic=self.antithetic,
+            control_variates=self.control_variates, nr_workers=self.nr_workers, 
+            seed=self.seed if (seed is None) else seed, normal_source=self.normal_source)
+    
+    
+    def price(self) -> float:
+        """
+        Monte Carlo price of the option
+        """
+        
+        return self.price_mc_result().price
+    
+    
+    def price_greeks(self) -> PriceGreeks:
+        """
+        Price and greeks of the option, by finite differences of Monte Carlo revaluations that all 
+        use the same random numbers (same seed, number of paths and of observation dates), so the 
+        noise of the differences stays small: central s0 bumps (delta, gamma), forward volatility,
+        rate and maturity bumps (vega, rho, theta)
+        """
+        
+        seed = np.random.SeedSequence().entropy if (self.seed is None) else self.seed
+        # Same stream for every revaluation: a fresh generator from the seed, or the seeded blocks of 
+        # the process pool
+        pool_seed = seed if (self.nr_workers != 1) else None
+        nr_steps = self.get_nr_steps()
+        
+        # The revaluations simulate the same paths as the base run (same stream and number of paths)
+        base = self.price_mc_result(rng=np.random.default_rng(seed), seed=pool_seed)
+        
+        def revalue(**bumps) -> float:
+            return self.price_mc_result(rng=np.random.default_rng(seed), nr_steps=nr_steps, seed=pool_seed, 
+                max_sims=base.nr_paths, **bumps).price
+        
+        return self._bumped_greeks(base.price, revalue)
         
         
+    def _bumped_greeks(self, price: float, revalue) -> PriceGreeks:
+        """
+        Greeks by finite differences around price, revalue(**bumps) being the price with s0, annual_vol,
+        free_rate or maturity bumped (the number of observation dates being kept)
+        """
+        
+        maturity = self.get_years_to_maturity()
+        annual_vol = self.get_annual_vol(maturity)
+        bump = self.s0*self.S0_BUMP
+        up, down = revalue(s0=self.s0 + bump), revalue(s0=self.s0 - bump)
+        
+        return PriceGreeks(
+            price = price,
+            delta = (up - down)/(2*bump),
+            gamma = (up - 2*price + down)/(bump**2),
+            vega  = (revalue(annual_vol=annual_vol + VEGA_BUMP) - price)/VEGA_BUMP,
+            rho   = (revalue(free_rate=self.free_rate + RHO_BUMP) - price)/RHO_BUMP,
+            theta = (revalue(maturity=maturity - self.THETA_BUMP) - price)/self.THETA_BUMP
+                if (maturity > self.THETA_BUMP) else np.nan)
+        
+        
+    def delta(self) -> float:
+        return self.price_greeks().delta
+         
+    def gamma(self) -> float:
+        return self.price_greeks().gamma
+    
+    def vega(self) -> float:
+        return self.price_greeks().vega
+    
+    def rho(self) -> float:
+        return self.price_greeks().rho
+    
+    
+    def copy(self):
+        
+        new_op = self.__class__()
+        new_op.__dict__.update(self.__dict__)
+        new_op._contract = self._contract
+        new_op.vol_surface = self.vol_surface
+        
+        return new_op
+    
+    
+class AsianOption(PathDependentOption):
+    """
+    - Call: max(A - X, 0)
+    - Put:  max(X - A, 0)
+    A being the (arithmetic or geometric) average of the underlying over the observation dates
+    
+    average_type (AverageType)      Arithmetic or Geometric average
+    
+    The geometric option is priced in closed form (geometric_asian), as are its greeks (same bumps
+    as the Monte Carlo ones), and it is the control variate of the arithmetic one
+    """
+    
+    def __init__(self):
+        
+        super().__init__()
+        self.average_type: AverageType = AverageType.Arithmetic
+        
+    def payoff(self) -> PathPayoff:
+        
+        return AsianPayoff(self.strike, self.is_call(), geometric=(self.average_type is AverageType.Geometric))
+    
+    
+    def _geometric_price(self, s0: float = None, maturity: float = None, annual_vol: float = None, 
+        free_rate: float = None) -> float:
+        """
+        Closed form price of the geometric Asian Option, on the current number of observation dates.
+        Any of the market parameters can be overridden (revaluations of the greeks)
+        """
+        
+        maturity = self.get_years_to_maturity() if (maturity is None) else maturity
+        annual_vol = self.get_annual_vol(maturity) if (annual_vol is None) else annual_vol
+        
+        return float(geometric_asian(self.s0 if (s0 is None) else s0, self.strike, maturity, annual_vol, 
+            self.free_rate if (free_rate is None) else free_rate, self.div_yield, self.get_nr_steps(), 
+            self.is_call()))
+    
+    
+    def price(self) -> float:
+        """
+        Price of the Asian Option (closed form if the average is geometric, Monte Carlo otherwise)
+        """
+        
+        if (self.average_type is AverageType.Geometric):
+            return self._geometric_price()
+        
+        return super().price()
+    
+    
+    def price_greeks(self) -> PriceGreeks:
+        """
+        Price and greeks of the Asian Option (bumped closed form prices if the average is geometric, 
+        Monte Carlo revaluations otherwise)
+        """
+        
+        if (self.average_type is AverageType.Geometric):
+            return self._bumped_greeks(self._geometric_price(), self._geometric_price)
+        
+        return super().price_greeks()
+    
+    
+    def to_text(self):
+        average = "Arithmetic" if (self.average_type is AverageType.Arithmetic) else "Geometric"
+        
+        option_txt = super().to_text()
+        return f"{option_txt}\
+            • Average               {average}\n"
+            
+            
+class BarrierOption(PathDependentOption):
+    """
+    Vanilla (EU) Option, knocked in or out when the underlying reaches the barrier on an observation date
+    
+    barrier (float)                         Barrier level
+    barrier_direction (BarrierDirection)    Up (barrier above s0) or Down (barrier below s0)
+    barrier_knock (BarrierKnock)            Knock-In or Knock-Out
+    """
+    
+    def __init__(self):
+        
+        super().__init__()
+        self.barrier:           float               = 120
+        self.barrier_direction: BarrierDirection    = BarrierDirection.Up
+        self.barrier_knock:     BarrierKnock        = BarrierKnock.Out
+        
+    def set_barrier(self, barrier_str: str):
+        try:
+            barrier_nr = float(barrier_str)
+        except:
+            raise ValueError("Option: Barrier must be a number")
 
+        self.barrier = round(barrier_nr, 2)
+        
+    def payoff(self) -> PathPayoff:
+        
+        return BarrierPayoff(self.strike, self.barrier, self.is_call(), 
+            up=(self.barrier_direction is BarrierDirection.Up), knock_in=(self.barrier_knock is BarrierKnock.In))
+    
+    
+    def to_text(self):
+        direction = "Up" if (self.barrier_direction is BarrierDirection.Up) else "Down"
+        knock = "In" if (self.barrier_knock is BarrierKnock.In) else "Out"
+        
+        option_txt = super().to_text()
+        return f"{option_txt}\
+            • Barrier               {self.barrier} € ({direction}-and-{knock})\n"
+            
+            
+class LookbackOption(PathDependentOption):
+    """
+    Floating strike Lookback Option (the strike is not used)
+    - Call: St - min(S)
+    - Put:  max(S) - St
+    the extreme being taken over the observation dates
+    """
+    
+    def payoff(self) -> PathPayoff:
+        
+        return LookbackPayoff(self.is_call())
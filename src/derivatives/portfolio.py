@@ -0,0 +1,248 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Definition of the Portfolio: positions on an Option Book, with greeks aggregated by underlying and maturity
+"""
+
+import numpy as np
+import pandas as pd
+
+from option_pricing import PriceGreeks
+from option_book import OptionBook, ProductKind
+from options import Option, OptionType, OptionStyle, USPricing
+
+
+class Portfolio(OptionBook):
+    """
+    Portfolio
+
+    == Summary ==
+    Option Book with a position on each contract: a quantity (negative if sold) and the underlying
+    it is written on. The price and greeks of every contract come from one fused pass per homogeneous
+    slice of the book (see OptionBook.price_greeks), are scaled by the quantities, and are summed
+    per bucket (underlying, maturity) with one stable sort of the keys and np.add.reduceat, never
+    with a loop over positions
+
+    == Attributes ==
+    quantity (np.ndarray)       Quantity of each position
+    underlying (np.ndarray)     Underlying of each position (index in underlyings)
+    underlyings (list)          Names of the underlyings
+    """
+
+    DEFAULT_UNDERLYING = "Underlying"
+    GREEKS = ("delta", "gamma", "vega", "rho", "theta")
+
+    def __init__(self, capacity: int = 1024):
+
+        super().__init__(capacity)
+        self._columns["quantity"] = np.empty(capacity)
+        self._columns["underlying"] = np.empty(capacity, dtype=np.int64)
+        self.underlyings:   list    = []
+        self._codes:        dict    = {}
+
+
+    def filter(self, rows) -> "Portfolio":
+
+        portfolio = super().filter(rows)
+        # Own copies: names added to the filtered portfolio must not leak into this one
+        portfolio.underlyings, portfolio._codes = list(self.underlyings), dict(self._codes)
+
+        return portfolio
+
+
+    def _underlying_codes(self, underlying) -> np.ndarray:
+        """
+        Index of each underlying name in underlyings (new names are added)
+        """
+
+        names, inverse = np.unique(np.asarray(underlying, dtype=str), return_inverse=True)
+
+        for name in map(str, names):
+            if name not in self._codes:
+                self._codes[name] = len(self.underlyings)
+                self.underlyings.append(name)
+
+        return np.array([self._codes[name] for name in map(str, names)], dtype=np.int64)[inverse]
+
+
+    def append(self, s0: float, strike: float, maturity: float, vol: float, rate: float, div: float,
+        option_type: OptionType = OptionType.Call, option_style: OptionStyle = OptionStyle.EU,
+        kind: ProductKind = ProductKind.Vanilla, us_pricing: USPricing = USPricing.Analytic,
+        quantity: float = 1.0, underlying: str = DEFAULT_UNDERLYING):
+        """
+        Adds one position to the portfolio (maturity in years)
+        """
+
+        super().append(s0, strike, maturity, vol, rate, div, option_type, option_style, kind, us_pricing)
+        self._columns["quantity"][self._size - 1] = quantity
+        self._columns["underlying"][self._size - 1] = self._underlying_codes(underlying)
+
+
+    def extend(self, s0, strike, maturity, vol, rate, div, option_type=OptionType.Call,
+        option_style=OptionStyle.EU, kind=ProductKind.Vanilla, us_pricing=USPricing.Analytic, quantity=1.0,
+        underlying=DEFAULT_UNDERLYING):
+        """
+        Adds a batch of positions to the portfolio (see OptionBook.extend). quantity and underlying
+        can be scalars or arrays
+        """
+
+        start = self._size
+        super().extend(s0, strike, maturity, vol, rate, div, option_type, option_style, kind, us_pricing)
+        nr_rows = self._size - start
+
+        self._columns["quantity"][start:self._size] = np.broadcast_to(np.asarray(quantity, dtype=float),
+            (nr_rows,))
+        self._columns["underlying"][start:self._size] = np.broadcast_to(self._underlying_codes(underlying),
+            (nr_rows,))
+
+
+    def add_option(self, option: Option, quantity: float = 1.0, underlying: str = DEFAULT_UNDERLYING):
+        """
+        Adds a position on a VanillaOption or an AssetOrNothinOption
+        """
+
+        super().add_option(option, quantity=quantity, underlying=underlying)
+
+
+    def position_greeks(self, us_pricing: USPricing = None) -> PriceGreeks:
+        """
+        Value and greeks of each position (contract price and greeks times its quantity)
+        """
+
+        return PriceGreeks(*(self.quantity*x for x in self.price_greeks(us_pricing)))
+
+
+    def net_greeks(self, us_pricing: USPricing = None) -> PriceGreeks:
+        """
+        Value and greeks of the whole portfolio
+        """
+
+        return PriceGreeks(*(float(x.sum()) for x in self.position_greeks(us_pricing)))
+
+
+    def _maturity_buckets(self, maturity_buckets) -> np.ndarray:
+        """
+        Maturity bucket of each position: its maturity, or the first bucket bound at or above it
+        (inf beyond the last bound)
+        """
+
+        if (maturity_buckets is None):
+            return self.maturity
+
+        bounds = np.append(np.sort(np.asarray(maturity_buckets, dtype=float)), np.inf)
+
+        return bounds[np.searchsorted(bounds, self.maturity)]
+
+
+    @staticmethod
+    def _grouped_sums(keys: tuple, values: np.ndarray) -> tuple:
+        """
+        _grouped_sums
+
+        == Summary ==
+        Sums of the values of each group of equal keys: one stable sort of the rows by the keys (first
+        key first), the start of every run of equal keys, and one np.add.reduceat per value row
+
+        == Args ==
+        keys (tuple):           Key arrays (one entry per position)
+        values (np.ndarray):    Values to sum (fields x positions)
+
+        == Returns ==
+        (tuple) Keys of each group, sums (fields x groups) and number of positions of each group
+        """
+
+        order = np.lexsort(keys[::-1])
+        keys = [key[order] for key in keys]
+
+        new_group = np.zeros(order.size, dtype=bool)
+        new_group[0] = True
+        for key in keys:
+            new_group[1:] |= (key[1:] != key[:-1])
+        starts = np.flatnonzero(new_group)
+
+        sums = np.add.reduceat(values[:, order], starts, axis=1)
+
+        return [key[starts] for key in keys], sums, np.diff(np.append(starts, order.size))
+
+
+    def bucket_greeks(self, maturity_buckets=None, us_pricing: USPricing = None) -> pd.DataFrame:
+        """
+        bucket_greeks
+
+        == Summary ==
+        Number of positions, value and net greeks of each (underlying, maturity) bucket
+
+        == Args ==
+        maturity_buckets (array):   Upper bounds of the maturity buckets, in years (None: one bucket
+                                    per maturity)
+        us_pricing (USPricing):     Pricing model of all the US options (Analytic or Binomial), None
+                                    for the one of each position
+
+        == Returns ==
+        (pd.DataFrame) One row per bucket, indexed by underlying and maturity
+        """
+
+        return self._bucket_frame(np.vstack(self.position_greeks(us_pricing)), maturity_buckets)
+
+
+    def _bucket_frame(self, values: np.ndarray, maturity_buckets=None, by_maturity: bool = True) -> pd.DataFrame:
+        """
+        Df of the grouped sums of the position values and greeks (by underlying, and maturity bucket)
+        """
+
+        columns = ["positions", "value", *Portfolio.GREEKS]
+
+        if (self._size == 0):
+            return pd.DataFrame(columns=columns)
+
+        keys = (self.underlying, self._maturity_buckets(maturity_buckets)) if by_maturity else (self.underlying,)
+        keys, sums, counts = Portfolio._grouped_sums(keys, values)
+
+        underlyings = np.array(self.underlyings, dtype=object)[keys[0]]
+        if by_maturity:
+            index = pd.MultiIndex.from_arrays([underlyings, keys[1]], names=["underlying", "maturity"])
+        else:
+            index = pd.Index(underlyings, name="underlying")
+
+        return pd.DataFrame(np.column_stack((counts, sums.T)), index=index, columns=columns).astype(
+            {"positions": int})
+
+
+    def risk_report(self, maturity_buckets=None, us_pricing: USPricing = None) -> pd.DataFrame:
+        """
+        risk_report
+
+        == Summary ==
+        Risk report of the portfolio: number of positions, value and net Delta, Gamma, Vega, Rho
+        and Theta of every (underlying, maturity) bucket, followed by the total of each underlying,
+        and the total of the portfolio. All the rows come from a single pricing pass
+
+        == Args ==
+        maturity_buckets (array):   Upper bounds of the maturity buckets, in years (None: one bucket
+                                    per maturity)
+        us_pricing (USPricing):     Pricing model of all the US options (Analytic or Binomial), None
+                                    for the one of each position
+
+        == Returns ==
+        (pd.DataFrame) One row per bucket, per underlying total ("Total" maturity) and for the
+        portfolio ("Portfolio", "Total")
+        """
+
+        values = np.vstack(self.position_greeks(us_pricing))
+        buckets = self._bucket_frame(values, maturity_buckets)
+        totals = self._bucket_frame(values, by_maturity=False)
+
+        rows = []
+        for underlying, total in totals.iterrows():
+            rows.append(buckets.loc[[underlying]])
+            rows.append(pd.DataFrame([total], index=pd.MultiIndex.from_tuples([(underlying, "Total")])))
+
+        grand_total = totals.sum().to_frame().T
+        grand_total.index = pd.MultiIndex.from_tuples([("Portfolio", "Total")])
+        rows.append(grand_total)
+
+        report = pd.concat(rows).astype({"positions": int})
+        report.index.names = ["underlying", "maturity"]
+
+        return report
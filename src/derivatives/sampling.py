@@ -0,0 +1,416 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Sources of standard normal samples for the Monte Carlo engines: pseudo-random numbers, or a
+scrambled Sobol sequence (Quasi-Monte Carlo) with a Brownian bridge time ordering
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from option_pricing import N
+
+
+# Bits of precision of the Sobol points (the sequence has at most 2^SOBOL_BITS points)
+SOBOL_BITS = 32
+
+
+class NormalSource:
+    """
+    NormalSource
+
+    == Summary ==
+    Source of standard normal samples. Calls are consecutive draws of the same stream: every
+    path gets nr_dims normals (one per time step), and reset restarts the stream (so that two
+    runs, e.g. the revaluations of bump greeks, see the same normals)
+    """
+
+    def normals(self, nr_dims: int, nr_paths: int) -> np.ndarray:
+        """
+        (np.ndarray) Standard normals, nr_dims x nr_paths
+        """
+        raise NotImplementedError("Not Implemented Error")
+
+    def reset(self):
+        """
+        Restarts the stream from its first draw
+        """
+        raise NotImplementedError("Not Implemented Error")
+
+
+class PseudoRandomNormals(NormalSource):
+    """
+    PseudoRandomNormals
+
+    == Summary ==
+    Independent pseudo-random normals, drawn from a numpy Generator
+
+    == Attributes ==
+    seed (int):             Seed of the generator (None: a random one, drawn again on reset)
+    rng (Generator):        Random number generator
+    """
+
+    def __init__(self, seed=None):
+
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+
+    def normals(self, nr_dims: int, nr_paths: int) -> np.ndarray:
+
+        return self.rng.standard_normal((nr_dims, nr_paths))
+
+
+    def reset(self):
+
+        self.rng = np.random.default_rng(self.seed)
+
+
+class SobolNormals(NormalSource):
+    """
+    SobolNormals
+
+    == Summary ==
+    Quasi-random normals: points of a scrambled Sobol sequence (see SobolSequence), turned into
+    normals with the inverse normal CDF (see inverse_normal). With brownian_bridge, the first
+    dimensions of the sequence (the most uniform ones) build the Brownian path from its end
+    point down to the finest time steps (see BrownianBridge), and the normals returned are the
+    increments of that path, so that most of the variance of a path is driven by the first
+    few dimensions. Convergence is then close to 1/nr_paths for smooth payoffs
+
+    == Attributes ==
+    seed (int):                 Seed of the scrambling (and of the direction numbers)
+    brownian_bridge (bool):     Whether the dimensions are assigned by a Brownian bridge
+    """
+
+    def __init__(self, seed=None, brownian_bridge: bool = True):
+
+        self.seed = seed
+        self.brownian_bridge = brownian_bridge
+        self._sequence = None
+        self._bridge = None
+
+
+    def normals(self, nr_dims: int, nr_paths: int) -> np.ndarray:
+
+        # A new number of dimensions restarts the sequence
+        if (self._sequence is None) or (self._sequence.nr_dims != nr_dims):
+            self._sequence = SobolSequence(nr_dims, self.seed)
+            self._bridge = BrownianBridge(nr_dims) if self.brownian_bridge else None
+
+        normals = inverse_normal(self._sequence.uniforms(nr_paths))
+
+        return normals if (self._bridge is None) else self._bridge.increments(normals)
+
+
+    def reset(self):
+
+        self._sequence = None
+
+
+def _gf2_mulmod(a: int, b: int, poly: int, degree: int) -> int:
+    """
+    Product of the polynomials a and b over GF(2) (bits are coefficients), modulo poly
+    """
+
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a <<= 1
+        if (a >> degree) & 1:
+            a ^= poly
+
+    return result
+
+
+def _prime_factors(n: int) -> set:
+    """
+    Prime factors of n (trial division)
+    """
+
+    factors, q = set(), 2
+    while q*q <= n:
+        while (n % q == 0):
+            factors.add(q)
+            n //= q
+        q += 1
+
+    return factors | ({n} if (n > 1) else set())
+
+
+def _gf2_is_primitive(poly: int, degree: int, factors: set) -> bool:
+    """
+    Whether poly (of the given degree) is primitive over GF(2): x has order 2^degree - 1 modulo poly
+    (factors: prime factors of 2^degree - 1)
+    """
+
+    order = (1 << degree) - 1
+
+    def power_of_x(exponent: int) -> int:
+        result, base = 1, 2 % poly
+        while exponent:
+            if exponent & 1:
+                result = _gf2_mulmod(result, base, poly, degree)
+            base = _gf2_mulmod(base, base, poly, degree)
+            exponent >>= 1
+        return result
+
+    return (power_of_x(order) == 1) and all(power_of_x(order//q) != 1 for q in factors)
+
+
+@lru_cache(maxsize=None)
+def _primitive_polynomials_of_degree(degree: int) -> tuple:
+    """
+    Every primitive polynomial of the given degree over GF(2), by value
+    """
+
+    factors = _prime_factors((1 << degree) - 1)
+
+    return tuple(poly for poly in range((1 << degree) + 1, 1 << (degree + 1), 2)
+        if _gf2_is_primitive(poly, degree, factors))
+
+
+def primitive_polynomials(count: int) -> list:
+    """
+    First count primitive polynomials over GF(2), ordered by degree and then by value (as in the
+    usual Sobol tables), found by testing every polynomial with a constant term
+
+    == Returns ==
+    (list) (degree, polynomial) pairs, the bits of polynomial being its coefficients
+    """
+
+    found = []
+    degree = 1
+    while len(found) < count:
+        found += [(degree, poly) for poly in _primitive_polynomials_of_degree(degree)]
+        degree += 1
+
+    return found[:count]
+
+
+def _parity(x: np.ndarray) -> np.ndarray:
+    """
+    Parity of the number of set bits of each (uint64) element
+    """
+
+    x = x ^ (x >> np.uint64(32))
+    for shift in (16, 8, 4, 2, 1):
+        x ^= x >> np.uint64(shift)
+
+    return x & np.uint64(1)
+
+
+class SobolSequence:
+    """
+    SobolSequence
+
+    == Summary ==
+    Scrambled Sobol low-discrepancy sequence, self-contained:
+    - The first dimension is the van der Corput sequence, the following ones use the primitive
+      polynomials over GF(2) in order (see primitive_polynomials), with random odd initial
+      direction numbers (seeded)
+    - Scrambling: random linear matrix scrambling (lower triangular, unit diagonal) of the
+      direction numbers, plus a random digital shift
+    - Points are generated in Gray code order, vectorized: each point differs from the previous
+      one by one direction number, so a chunk is one cumulative XOR of gathered direction numbers
+
+    == Attributes ==
+    nr_dims (int):          Number of dimensions
+    index (int):            Index of the next point
+    """
+
+    def __init__(self, nr_dims: int, seed=None):
+
+        rng = np.random.default_rng(seed)
+        bits = SOBOL_BITS
+
+        self.nr_dims = nr_dims
+        self.index = 0
+
+        # m_k: odd integers below 2^k, defined by the recurrence of each polynomial
+        m = np.ones((nr_dims, bits), dtype=np.int64)
+        for dim, (degree, poly) in enumerate(primitive_polynomials(nr_dims - 1), start=1):
+            m_dim = (2*rng.integers(0, 1 << np.arange(degree), size=degree) + 1).tolist()
+            taps = [i for i in range(1, degree) if (poly >> (degree - i)) & 1]
+            for k in range(degree, bits):
+                value = m_dim[k - degree] ^ (m_dim[k - degree] << degree)
+                for i in taps:
+                    value ^= m_dim[k - i] << i
+                m_dim.append(value)
+            m[dim] = m_dim
+
+        # Direction numbers v_k = m_k / 2^k, as integers with SOBOL_BITS bits
+        directions = (m << (bits - 1 - np.arange(bits))).astype(np.uint64)
+
+        # Linear matrix scrambling: bit r (from the top) of each direction number becomes the parity
+        # of the bits of row r of a random lower triangular matrix (unit diagonal), per dimension
+        rows = rng.integers(0, 2, size=(nr_dims, bits, bits), dtype=np.uint64)
+        rows = np.tril(rows, k=-1) + np.eye(bits, dtype=np.uint64)
+        row_masks = (rows << (bits - 1 - np.arange(bits, dtype=np.uint64))).sum(axis=2, dtype=np.uint64)
+
+        scrambled = np.zeros_like(directions)
+        for r in range(bits):
+            scrambled |= _parity(directions & row_masks[:, r, None]) << np.uint64(bits - 1 - r)
+
+        self._directions = scrambled
+        # Digital shift: the first point, every other one is XORed from it
+        self._state = rng.integers(0, 1 << bits, size=nr_dims, dtype=np.uint64)
+
+
+    def uniforms(self, nr_points: int) -> np.ndarray:
+        """
+        Next nr_points points of the sequence, as uniforms in (0, 1), nr_dims x nr_points
+        """
+
+        indexes = np.arange(self.index, self.index + nr_points, dtype=np.uint64)
+
+        if (self.index + nr_points > 2**SOBOL_BITS):
+            raise ValueError("SobolSequence: The sequence is exhausted")
+
+        # Gray code step: point i is point i-1 XOR the direction number of the lowest set bit of i
+        # (point 0 is the digital shift itself)
+        points = np.empty((self.nr_dims, nr_points), dtype=np.uint64)
+        lowest = indexes & (~indexes + np.uint64(1))
+        steps = np.log2(np.maximum(lowest, 1).astype(float)).astype(np.intp)
+        points[:] = self._directions[:, steps]
+        if (self.index == 0):
+            points[:, 0] = 0
+        points[:, 0] ^= self._state
+        np.bitwise_xor.accumulate(points, axis=1, out=points)
+
+        self._state = points[:, -1].copy()
+        self.index += nr_points
+
+        return (points.astype(float) + 0.5)*(0.5**SOBOL_BITS)
+
+
+# Coefficients of the rational approximations of the inverse normal CDF (Acklam)
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+    1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+    6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+    -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+    3.754408661907416e+00)
+_ACKLAM_LOW = 0.02425
+
+
+def inverse_normal(p: np.ndarray) -> np.ndarray:
+    """
+    inverse_normal
+
+    == Summary ==
+    Inverse of the standard normal CDF, for p in (0, 1): Acklam's rational approximation (relative
+    error below 1.2e-9), refined by one Halley step on N (absolute error around 1e-12)
+
+    == Args ==
+    p (array):              Probabilities
+
+    == Returns ==
+    (np.ndarray) Quantiles of the standard normal distribution
+    """
+
+    p = np.asarray(p, dtype=float)
+    x = np.empty_like(p)
+
+    # Tails, on q = sqrt(-2 log(min(p, 1-p))), with the sign of the side
+    tail = np.minimum(p, 1 - p)
+    is_tail = (tail < _ACKLAM_LOW)
+    q = np.sqrt(-2*np.log(tail[is_tail]))
+    c, d = _ACKLAM_C, _ACKLAM_D
+    x[is_tail] = (((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) / \
+        ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1)
+    x[is_tail & (p > 0.5)] *= -1
+
+    # Central region
+    is_central = ~is_tail
+    q = p[is_central] - 0.5
+    r = q*q
+    a, b = _ACKLAM_A, _ACKLAM_B
+    x[is_central] = (((((a[0]*r + a[1])*r + a[2])*r + a[3])*r + a[4])*r + a[5])*q / \
+        (((((b[0]*r + b[1])*r + b[2])*r + b[3])*r + b[4])*r + 1)
+
+    # Halley refinement
+    error = N(x) - p
+    u = error*np.sqrt(2*np.pi)*np.exp(x*x/2)
+    x -= u/(1 + x*u/2)
+
+    return x
+
+
+class BrownianBridge:
+    """
+    BrownianBridge
+
+    == Summary ==
+    Brownian bridge construction of a Brownian path on nr_steps equal time steps: the first normal
+    sets the end point, the next ones the midpoints of the intervals already built (conditional
+    on their ends), and so on down to single steps. The order of the steps and the weights are
+    precomputed once
+
+    == Attributes ==
+    nr_steps (int):         Number of time steps
+    """
+
+    def __init__(self, nr_steps: int):
+
+        self.nr_steps = nr_steps
+        # Time of each point (unit steps), the point built by each normal and its left/right neighbours
+        times = np.arange(1, nr_steps + 1, dtype=float)
+        built = np.zeros(nr_steps, dtype=bool)
+        self._point = np.zeros(nr_steps, dtype=np.intp)
+        self._left = np.zeros(nr_steps, dtype=np.intp)
+        self._right = np.zeros(nr_steps, dtype=np.intp)
+        self._left_weight = np.zeros(nr_steps)
+        self._right_weight = np.zeros(nr_steps)
+        self._std_dev = np.zeros(nr_steps)
+
+        built[-1] = True
+        self._point[0] = nr_steps - 1
+        self._std_dev[0] = np.sqrt(times[-1])
+
+        j = 0
+        for i in range(1, nr_steps):
+            # Next interval not built yet: (j - 1, k], its midpoint l
+            while built[j]:
+                j += 1
+            k = j
+            while not built[k]:
+                k += 1
+            l = j + ((k - 1 - j) >> 1)
+            built[l] = True
+
+            left_time = times[j - 1] if (j > 0) else 0.0
+            self._point[i], self._left[i], self._right[i] = l, j - 1, k
+            self._left_weight[i] = (times[k] - times[l])/(times[k] - left_time)
+            self._right_weight[i] = (times[l] - left_time)/(times[k] - left_time)
+            self._std_dev[i] = np.sqrt((times[l] - left_time)*(times[k] - times[l])/(times[k] - left_time))
+
+            j = k + 1
+            if (j >= nr_steps):
+                j = 0
+
+
+    def increments(self, normals: np.ndarray) -> np.ndarray:
+        """
+        Builds the Brownian paths from normals (nr_steps x nr_paths, in bridge order) and returns their
+        increments, which are standard normals in time order (nr_steps x nr_paths)
+        """
+
+        path = np.empty_like(normals)
+        path[self._point[0]] = self._std_dev[0]*normals[0]
+
+        for i in range(1, self.nr_steps):
+            point, left, right = self._point[i], self._left[i], self._right[i]
+            path[point] = self._right_weight[i]*path[right] + self._std_dev[i]*normals[i]
+            if (left >= 0):
+                path[point] += self._left_weight[i]*path[left]
+
+        path[1:] -= path[:-1].copy()
+
+        return path
@@ -0,0 +1,242 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Definition of the Structured Products: notes built from a zero-coupon bond and option legs
+"""
+
+from enum import Enum
+from typing import NamedTuple
+
+import numpy as np
+
+from option_pricing import price_greeks, PriceGreeks
+from options import Option, OptionType
+
+
+class LegKind(Enum):
+    ZeroCoupon = 1
+    Vanilla = 2
+    AssetOrNothing = 3
+
+
+class Leg(NamedTuple):
+    """
+    Leg of a Structured Product. Strikes and caps are performances of the underlying (fraction of the
+    reference level of the product, 1.0 is at the money), and every leg pays per unit of notional:
+    - ZeroCoupon:       1 at maturity
+    - Vanilla:          max(S_T/ref - strike, 0) for Calls, max(strike - S_T/ref, 0) for Puts,
+                        capped at |cap - strike| if there is a cap
+    - AssetOrNothing:   S_T/ref if S_T/ref is above (Call) / below (Put) the strike
+
+    == Attributes ==
+    kind (LegKind):             Zero-Coupon Bond, Vanilla or Asset-Or-Nothing
+    weight (float):             Units of the leg per unit of notional (negative if sold)
+    strike (float):             Strike, as a performance (not used by the Zero-Coupon Bond)
+    option_type (OptionType):   Call or Put
+    participation (float):      Participation rate (multiplies the weight)
+    cap (float):                Cap of a Vanilla leg, as a performance (None for no cap)
+    """
+    kind: LegKind
+    weight: float = 1.0
+    strike: float = 1.0
+    option_type: OptionType = OptionType.Call
+    participation: float = 1.0
+    cap: float = None
+
+
+class StructuredProduct(Option):
+    """
+    StructuredProduct
+
+    == Summary ==
+    Class that represents a Structured Product: a weighted sum of legs (see Leg) on one underlying,
+    all maturing together. s0, maturity, annual_vol, free_rate and div_yield are the ones of
+    Option, strike is the reference level of the underlying (initial fixing) the legs are
+    relative to.
+    Pricing never goes through one option per leg: every option leg (a capped Vanilla being a long
+    and a short Vanilla) is priced in a single call of the fused Black-Scholes kernel, and the
+    weighted legs are summed with one dot product. The Zero-Coupon Bond is discounted in closed form
+
+    == Attributes ==
+    name (str)                  Name of the product
+    notional (float)            Notional of the product
+    legs (list)                 Legs of the product (Leg)
+    """
+
+    def __init__(self, name: str = "Structured Product", legs: list = None):
+
+        super().__init__()
+        self.name:          str     = name
+        self.notional:      float   = 100
+        self.legs:          list    = [] if (legs is None) else list(legs)
+
+
+    @classmethod
+    def capital_protected_note(cls, protection: float = 1.0, participation: float = 1.0, cap: float = None):
+        """
+        Capital-Protected Note: protection of the notional at maturity (Zero-Coupon Bond), plus the
+        participation in the rise of the underlying (ATM Call, capped if there is a cap)
+        """
+
+        return cls("Capital-Protected Note", [
+            Leg(LegKind.ZeroCoupon, protection),
+            Leg(LegKind.Vanilla, 1.0, 1.0, OptionType.Call, participation, cap)
+        ])
+
+
+    @classmethod
+    def reverse_convertible(cls, coupon: float = 0.08, conversion_level: float = 1.0):
+        """
+        Reverse Convertible: notional plus a coupon at maturity (Zero-Coupon Bond), but paid in shares
+        of the underlying (at the conversion level) below the conversion level (short Puts)
+        """
+
+        return cls("Reverse Convertible", [
+            Leg(LegKind.ZeroCoupon, 1 + coupon),
+            Leg(LegKind.Vanilla, -1/conversion_level, conversion_level, OptionType.Put)
+        ])
+
+
+    @classmethod
+    def bull_spread(cls, lower: float = 0.9, upper: float = 1.1):
+        """
+        Bull Spread: Call at the lower strike, capped at the upper one (long lower Call, short upper Call)
+        """
+
+        return cls("Bull Spread", [Leg(LegKind.Vanilla, 1.0, lower, OptionType.Call, cap=upper)])
+
+
+    def add_leg(self, kind: LegKind, weight: float = 1.0, strike: float = 1.0,
+        option_type: OptionType = OptionType.Call, participation: float = 1.0, cap: float = None):
+
+        self.legs.append(Leg(kind, weight, strike, option_type, participation, cap))
+
+
+    def _option_legs(self) -> tuple:
+        """
+        Option legs as arrays (capped Vanillas split into a long and a short Vanilla)
+
+        == Returns ==
+        (tuple) Quantity (per unit of notional), strike (performance), vanilla flag and call flag of each
+        """
+
+        quantity, strike, vanilla, call = [], [], [], []
+
+        for leg in self.legs:
+
+            if (leg.kind is LegKind.ZeroCoupon):
+                continue
+
+            is_call = (leg.option_type is OptionType.Call)
+            legs = [(leg.weight*leg.participation, leg.strike)]
+
+            if (leg.cap is not None):
+                if (leg.kind is not LegKind.Vanilla) or ((leg.cap > leg.strike) != is_call):
+                    raise ValueError("StructuredProduct: Caps are only for Vanilla legs, beyond the strike")
+                legs.append((-leg.weight*leg.participation, leg.cap))
+
+            for leg_quantity, leg_strike in legs:
+                quantity.append(leg_quantity)
+                strike.append(leg_strike)
+                vanilla.append(leg.kind is LegKind.Vanilla)
+                call.append(is_call)
+
+        return np.array(quantity, dtype=float), np.array(strike, dtype=float), np.array(vanilla, dtype=bool), \
+            np.array(call, dtype=bool)
+
+
+    def price_greeks(self) -> PriceGreeks:
+        """
+        price_greeks
+
+        == Summary ==
+        Returns the price and all the greeks of the product (PriceGreeks): the option legs are priced
+        in one call of the fused Black-Scholes kernel (read off the volatility surface at the strike
+        of each leg, if there is one), and weighted by their quantities in one dot product
+        """
+
+        if (self.strike <= 0):
+            raise ValueError("StructuredProduct: Reference level must be positive")
+
+        maturity_years = self.get_years_to_maturity()
+        reference = self.strike
+
+        # Zero-Coupon Bonds: e^(-rT), rho = -T*e^(-rT), theta = r*e^(-rT)
+        zcb = sum(leg.weight*leg.participation for leg in self.legs if leg.kind is LegKind.ZeroCoupon)
+        discount = np.exp(-self.free_rate*maturity_years)
+        totals = np.array([discount, 0, 0, 0, -maturity_years*discount, self.free_rate*discount])*zcb
+
+        quantity, strike, vanilla, call = self._option_legs()
+        if (quantity.size > 0):
+            strike = strike*reference
+            annual_vol = self.annual_vol if (self.vol_surface is None) else \
+                self.vol_surface.vol(strike, maturity_years, self.s0)
+            results = price_greeks(self.s0, strike, annual_vol, maturity_years, self.free_rate, self.div_yield,
+                vanilla=vanilla, call=call)
+            # Options on the underlying, S_T/ref pays 1/ref of them
+            totals += np.vstack(np.broadcast_arrays(*results)) @ (quantity/reference)
+
+        return PriceGreeks(*(float(x) for x in self.notional*totals))
+
+
+    def price(self) -> float:
+
+        return self.price_greeks().price
+
+
+    def delta(self) -> float:
+
+        return self.price_greeks().delta
+
+
+    def gamma(self) -> float:
+
+        return self.price_greeks().gamma
+
+
+    def vega(self) -> float:
+
+        return self.price_greeks().vega
+
+
+    def rho(self) -> float:
+
+        return self.price_greeks().rho
+
+
+    def copy(self):
+
+        new_op = StructuredProduct(self.name, self.legs)
+
+        new_op._contract    = self._contract
+        new_op.vol_surface  = self.vol_surface
+        new_op.notional     = self.notional
+
+        return new_op
+
+
+    def to_text(self):
+        legs = "".join(f"\n\
+            • {self._leg_text(leg)}" for leg in self.legs)
+        return f"\
+            • {self.name}\n\
+            • Current Asset Price   {self.s0} €\n\
+            • Reference Level       {self.strike} €\n\
+            • Notional              {self.notional} €\n\
+            • Years to Maturity     {self.get_years_to_maturity()}\n\
+            • Annual Volatility     {round(self.annual_vol*100,2)}\n\
+            • Risk-free rate        {round(self.free_rate*100,2)}\n\
+            • Dividend Yield        {round(self.div_yield*100,2)}{legs}\n\
+        "
+
+
+    @staticmethod
+    def _leg_text(leg: Leg) -> str:
+
+        if (leg.kind is LegKind.ZeroCoupon):
+            return f"Zero-Coupon Bond      x {round(leg.weight*leg.participation,4)}"
+
+        cap = "" if (leg.cap is None) else f", cap {round(leg.cap*100,2)} %"
+        return f"{leg.kind.name} {leg.option_type.name}  x {round(leg.weight*leg.participation,4)}, strike "\
+            f"{round(leg.strike*100,2)} %{cap}"
@@ -0,0 +1,150 @@
+"""
+Author: PMC
+Date: 17 Oct 2026
+
+Definition of the Implied Volatility Surface
+"""
+
+from option_pricing import implied_vol
+
+import numpy as np
+
+
+class VolSurface:
+    """
+    VolSurface
+
+    == Summary ==
+    Implied Volatility Surface, indexed by forward log-moneyness (log(strike/forward)) and maturity
+
+    The surface is built once from an option chain: the total implied variance (vol^2 * T) of each
+    maturity is resampled on a common log-moneyness grid, and the bilinear interpolation coefficients
+    of every grid cell are precomputed. Lookups (vol) only locate the cell of each (strike, maturity)
+    pair and evaluate its polynomial, vectorized over arrays, so repricing against the surface
+    never refits anything.
+    Between maturities the total variance is linear in time, outside the grid the volatility is flat
+
+    == Attributes ==
+    s0 (float):                     Value of the underlying when the surface was built
+    free_rate (float):              Annual risk-free rate used for the forwards
+    div_yield (float):              Annual dividend yield used for the forwards
+    moneyness_grid (np.ndarray):    Log-moneyness nodes of the grid
+    maturity_grid (np.ndarray):     Maturity nodes of the grid (years)
+    """
+
+    def __init__(self, s0: float, strikes, maturities, vols, free_rate: float, div_yield: float,
+        nr_moneyness: int = 50):
+        """
+        == Args ==
+        s0 (float):             Current value of the underlying
+        strikes (array):        Strike of each quote
+        maturities (array):     Maturity of each quote (years)
+        vols (array):           Implied volatility of each quote (NaN quotes are ignored)
+        free_rate (float):      Annual risk free rate
+        div_yield (float):      Annual Dividend yield
+        nr_moneyness (int):     Number of log-moneyness nodes of the grid
+        """
+
+        self.s0 = s0
+        self.free_rate = free_rate
+        self.div_yield = div_yield
+
+        strikes, maturities, vols = (np.ravel(x).astype(float) for x in np.broadcast_arrays(strikes, maturities, vols))
+        valid = np.isfinite(vols) & (maturities > 0)
+
+        if not np.any(valid):
+            raise ValueError("VolSurface: No valid quotes to build the surface")
+
+        strikes, maturities, vols = strikes[valid], maturities[valid], vols[valid]
+        moneyness = self.log_moneyness(strikes, maturities)
+
+        self.moneyness_grid = np.linspace(moneyness.min(), moneyness.max(), nr_moneyness)
+        self.maturity_grid = np.unique(maturities)
+
+        # Total variance of each maturity, resampled on the log-moneyness grid
+        variance = np.empty((self.maturity_grid.size, nr_moneyness))
+        for j, maturity in enumerate(self.maturity_grid):
+            slice_ = (maturities == maturity)
+            order = np.argsort(moneyness[slice_])
+            variance[j] = np.interp(self.moneyness_grid, moneyness[slice_][order],
+                ((vols[slice_]**2)*maturity)[order])
+
+        if (self.maturity_grid.size == 1):
+            # Single maturity: flat volatility in time
+            self.maturity_grid = np.append(self.maturity_grid, 2*self.maturity_grid[0])
+            variance = np.vstack((variance, 2*variance))
+
+        if (nr_moneyness == 1) or (self.moneyness_grid[0] == self.moneyness_grid[-1]):
+            # Single strike: flat volatility in moneyness
+            self.moneyness_grid = np.array([self.moneyness_grid[0], self.moneyness_grid[0] + 1])
+            variance = np.hstack((variance[:, :1], variance[:, :1]))
+
+        # Bilinear coefficients of each cell: w = c0 + c1*u + c2*v + c3*u*v,
+        # u and v being the position inside the cell (0 to 1) along moneyness and maturity
+        w00, w01 = variance[:-1, :-1], variance[:-1, 1:]
+        w10, w11 = variance[1:, :-1], variance[1:, 1:]
+        self._coefs = np.stack((w00, w01 - w00, w10 - w00, w11 - w10 - w01 + w00), axis=-1)
+        self._moneyness_step = np.diff(self.moneyness_grid)
+        self._maturity_step = np.diff(self.maturity_grid)
+
+
+    @classmethod
+    def from_prices(cls, s0: float, prices, strikes, maturities, free_rate: float, div_yield: float,
+        call=True, nr_moneyness: int = 50):
+        """
+        from_prices
+
+        == Summary ==
+        Builds the surface from the market prices of a chain of EU options, inverted with implied_vol
+        (quotes that can not be inverted are left out)
+        """
+
+        vols = implied_vol(prices, s0, strikes, maturities, free_rate, div_yield, call)
+
+        return cls(s0, strikes, maturities, vols, free_rate, div_yield, nr_moneyness)
+
+
+    def log_moneyness(self, strike, maturity, s0=None) -> np.ndarray:
+        """
+        Forward log-moneyness, log(strike/forward)
+        """
+
+        s0 = self.s0 if (s0 is None) else s0
+
+        return np.log(strike/s0) - (self.free_rate - self.div_yield)*maturity
+
+
+    def vol(self, strike, maturity, s0=None) -> np.ndarray:
+        """
+        vol
+
+        == Summary ==
+        Implied volatility of options with the given strikes and maturities (scalars or arrays,
+        broadcast against each other)
+
+        == Args ==
+        strike (array):         Strike price
+        maturity (array):       Number of years until maturity
+        s0 (array):             Value of the underlying (defaults to the one of the surface). The surface
+                                moves with the underlying (sticky moneyness)
+
+        == Returns ==
+        (np.ndarray) Implied volatility of each option
+        """
+
+        moneyness = self.log_moneyness(np.asarray(strike, dtype=float), np.asarray(maturity, dtype=float), s0)
+        moneyness, maturity = np.broadcast_arrays(moneyness, np.asarray(maturity, dtype=float))
+
+        # Cell of each point, and position inside of it (flat outside of the grid)
+        i = np.clip(np.searchsorted(self.moneyness_grid, moneyness) - 1, 0, self._moneyness_step.size - 1)
+        j = np.clip(np.searchsorted(self.maturity_grid, maturity) - 1, 0, self._maturity_step.size - 1)
+        u = np.clip((moneyness - self.moneyness_grid[i])/self._moneyness_step[i], 0, 1)
+        v = np.clip((maturity - self.maturity_grid[j])/self._maturity_step[j], 0, 1)
+
+        coefs = self._coefs[j, i]
+        variance = coefs[..., 0] + coefs[..., 1]*u + coefs[..., 2]*v + coefs[..., 3]*u*v
+
+        # Total variance -> volatility, at the maturity the variance was read at
+        clipped_maturity = self.maturity_grid[j] + v*self._maturity_step[j]
+
+        return np.sqrt(np.maximum(variance, 0)/clipped_maturity)[()]